@@ -1,11 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from backend.app.database import get_db, Perfume, PerfumeRecipe
-from backend.app.schemas import PerfumeCreate, Perfume as PerfumeSchema, PerfumeDetail, PerfumeRecipeCreate, PerfumeRecipe as PerfumeRecipeSchema
+from starlette.concurrency import run_in_threadpool
+from typing import Iterator, List, Optional
+from backend.app.database import get_db, SessionLocal, Perfume, PerfumeRecipe
+from backend.app.schemas import PerfumeCreate, Perfume as PerfumeSchema, PerfumeDetail, PerfumeRecipeCreate, PerfumeRecipe as PerfumeRecipeSchema, PerfumeBulkResult
+from backend.app.perfume_catalog import perfume_catalog, perfume_detail_cache
+from backend.app.bulk_import import BulkImportResult, import_chunk, iter_text_lines, parse_csv, parse_ndjson
+import json
+import os
 
 router = APIRouter()
 
+# 대량 등록 시 한 트랜잭션으로 삽입하는 행 수
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("PERFUME_BULK_CHUNK_SIZE", "1000"))
+
+# NDJSON 내보내기 시 한 번에 읽는 행 수
+EXPORT_BATCH_SIZE = int(os.getenv("PERFUME_EXPORT_BATCH_SIZE", "1000"))
+
+# fields= 로 선택할 수 있는 목록 컬럼 (id는 커서로 쓰이므로 항상 포함)
+PERFUME_LIST_FIELDS = tuple(PerfumeSchema.model_fields)
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """fields=name,category 형식을 컬럼 이름 목록으로 바꿉니다 (생략하면 None = 전체 컬럼)."""
+    if not fields:
+        return None
+    names = ["id"]
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in PERFUME_LIST_FIELDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"알 수 없는 필드입니다: {name} (사용 가능: {', '.join(PERFUME_LIST_FIELDS)})"
+            )
+        names.append(name)
+    return names
+
+def _perfume_columns(names: List[str]):
+    return [getattr(Perfume, name) for name in names]
+
+def _perfume_list_query(db: Session, entities: list, category: Optional[str], brand: Optional[str],
+                        price_range: Optional[str], after_id: Optional[int]):
+    """필터와 키셋 커서(id > after_id)를 적용한 id 순 목록 쿼리."""
+    query = db.query(*entities)
+    if category:
+        query = query.filter(Perfume.category == category)
+    if brand:
+        query = query.filter(Perfume.brand == brand)
+    if price_range:
+        query = query.filter(Perfume.price_range == price_range)
+    if after_id is not None:
+        query = query.filter(Perfume.id > after_id)
+    return query.order_by(Perfume.id)
+
+def _iter_perfumes_ndjson(names: List[str], category: Optional[str], brand: Optional[str],
+                          price_range: Optional[str], after_id: Optional[int]) -> Iterator[str]:
+    """
+    조건에 맞는 향수 전체를 EXPORT_BATCH_SIZE개씩 키셋으로 읽어 NDJSON으로 내보냅니다.
+    배치마다 세션을 새로 열어 내보내는 동안 연결이나 트랜잭션을 오래 잡지 않습니다.
+    """
+    columns = _perfume_columns(names)
+    while True:
+        with SessionLocal() as db:
+            rows = _perfume_list_query(db, columns, category, brand, price_range, after_id).limit(EXPORT_BATCH_SIZE).all()
+        if not rows:
+            return
+        yield "".join(json.dumps(dict(row._mapping), ensure_ascii=False) + "\n" for row in rows)
+        if len(rows) < EXPORT_BATCH_SIZE:
+            return
+        after_id = rows[-1].id
+
 @router.post("/", response_model=PerfumeSchema)
 def create_perfume(perfume_data: PerfumeCreate, db: Session = Depends(get_db)):
     """새 향수를 등록합니다."""
@@ -17,39 +83,108 @@ def create_perfume(perfume_data: PerfumeCreate, db: Session = Depends(get_db)):
     db_perfume = Perfume(**perfume_data.dict())
     db.add(db_perfume)
     db.commit()
+    perfume_catalog.invalidate()
     db.refresh(db_perfume)
     return db_perfume
 
+@router.post("/bulk", response_model=PerfumeBulkResult)
+async def bulk_import_perfumes(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="생략하면 Content-Type으로 판단"),
+    chunk_size: int = Query(BULK_IMPORT_CHUNK_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    향수(와 제조법)를 NDJSON 또는 CSV 스트림으로 대량 등록합니다.
+    본문을 읽는 대로 chunk_size개씩 묶어 중복 확인 쿼리 한 번과 executemany 삽입으로 저장하며,
+    잘못된 행이나 중복 향수명은 전체를 중단하지 않고 행별 오류로 반환합니다.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    lines = iter_text_lines(request.stream())
+    rows = parse_csv(lines) if format == "csv" else parse_ndjson(lines)
+
+    result = BulkImportResult()
+    seen_names = set()
+    chunk = []
+    try:
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                await run_in_threadpool(import_chunk, db, chunk, seen_names, result)
+                chunk = []
+        if chunk:
+            await run_in_threadpool(import_chunk, db, chunk, seen_names, result)
+    finally:
+        if result.created:
+            perfume_catalog.invalidate()
+    return result.to_dict()
+
 @router.get("/", response_model=List[PerfumeSchema])
 def get_perfumes(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     category: str = None,
     brand: str = None,
     price_range: str = None,
+    after_id: Optional[int] = Query(None, description="키셋 커서: 이 ID 다음부터 조회 (X-Next-After-Id 헤더 값)"),
+    fields: Optional[str] = Query(None, description="응답에 포함할 필드 (쉼표 구분, id는 항상 포함)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson이면 조건에 맞는 전체를 스트리밍"),
     db: Session = Depends(get_db)
 ):
-    """향수 목록을 조회합니다."""
-    query = db.query(Perfume)
-    
-    # 필터링
-    if category:
-        query = query.filter(Perfume.category == category)
-    if brand:
-        query = query.filter(Perfume.brand == brand)
-    if price_range:
-        query = query.filter(Perfume.price_range == price_range)
-    
-    perfumes = query.offset(skip).limit(limit).all()
+    """
+    향수 목록을 id 순으로 조회합니다.
+    깊은 페이지는 skip 대신 after_id 커서를 사용하세요 (페이지가 가득 차면 다음 커서를 X-Next-After-Id 헤더로 반환).
+    format=ndjson이면 skip/limit 없이 조건에 맞는 향수 전체를 한 줄에 하나씩 스트리밍합니다.
+    """
+    names = _parse_fields(fields)
+    if format == "ndjson":
+        return StreamingResponse(
+            _iter_perfumes_ndjson(names or list(PERFUME_LIST_FIELDS), category, brand, price_range, after_id),
+            media_type="application/x-ndjson"
+        )
+
+    entities = [Perfume] if names is None else _perfume_columns(names)
+    query = _perfume_list_query(db, entities, category, brand, price_range, after_id)
+    if after_id is None and skip:
+        query = query.offset(skip)
+    perfumes = query.limit(limit).all()
+
+    headers = {}
+    if limit > 0 and len(perfumes) == limit:
+        headers["X-Next-After-Id"] = str(perfumes[-1].id)
+    if names is not None:
+        # 일부 필드만 조회한 경우 전체 스키마 검증을 거치지 않고 그대로 반환
+        return JSONResponse([dict(row._mapping) for row in perfumes], headers=headers)
+    response.headers.update(headers)
     return perfumes
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더(쉼표로 구분된 ETag 목록, W/ 약한 비교 허용, *)가 etag와 일치하는지 확인합니다."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
 @router.get("/{perfume_id}", response_model=PerfumeDetail)
-def get_perfume(perfume_id: int, db: Session = Depends(get_db)):
-    """특정 향수 정보를 조회합니다."""
-    perfume = db.query(Perfume).filter(Perfume.id == perfume_id).first()
-    if perfume is None:
+def get_perfume(perfume_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    특정 향수 정보를 (제조법 포함) 조회합니다.
+    직렬화된 응답을 캐시해 두고 ETag를 붙이며, If-None-Match가 일치하면 본문 없이 304를 반환합니다.
+    """
+    cached = perfume_detail_cache.get(db, perfume_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="향수를 찾을 수 없습니다")
-    return perfume
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.put("/{perfume_id}", response_model=PerfumeSchema)
 def update_perfume(perfume_id: int, perfume_data: PerfumeCreate, db: Session = Depends(get_db)):
@@ -63,6 +198,8 @@ def update_perfume(perfume_id: int, perfume_data: PerfumeCreate, db: Session = D
         setattr(perfume, field, value)
     
     db.commit()
+    perfume_catalog.invalidate()
+    perfume_detail_cache.invalidate(perfume_id)
     db.refresh(perfume)
     return perfume
 
@@ -75,6 +212,8 @@ def delete_perfume(perfume_id: int, db: Session = Depends(get_db)):
     
     db.delete(perfume)
     db.commit()
+    perfume_catalog.invalidate()
+    perfume_detail_cache.invalidate(perfume_id)
     return {"message": "향수가 삭제되었습니다"}
 
 @router.post("/{perfume_id}/recipes", response_model=PerfumeRecipeSchema)
@@ -91,18 +230,18 @@ def create_perfume_recipe(perfume_id: int, recipe_data: PerfumeRecipeCreate, db:
     )
     db.add(db_recipe)
     db.commit()
+    perfume_catalog.invalidate()
+    perfume_detail_cache.invalidate(perfume_id)
     db.refresh(db_recipe)
     return db_recipe
 
 @router.get("/{perfume_id}/recipes", response_model=List[PerfumeRecipeSchema])
 def get_perfume_recipes(perfume_id: int, db: Session = Depends(get_db)):
     """향수 제조법을 조회합니다."""
-    # 향수 존재 확인
-    perfume = db.query(Perfume).filter(Perfume.id == perfume_id).first()
-    if perfume is None:
-        raise HTTPException(status_code=404, detail="향수를 찾을 수 없습니다")
-    
     recipes = db.query(PerfumeRecipe).filter(PerfumeRecipe.perfume_id == perfume_id).all()
+    # 제조법이 없을 때만 향수 존재 확인 (없는 향수는 404)
+    if not recipes and db.query(Perfume.id).filter(Perfume.id == perfume_id).first() is None:
+        raise HTTPException(status_code=404, detail="향수를 찾을 수 없습니다")
     return recipes
 
 @router.get("/categories/list")
@@ -127,4 +266,9 @@ def get_perfume_categories():
         "genders": [
             "male", "female", "unisex"
         ]
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/cache/stats")
+def get_perfume_detail_cache_stats():
+    """향수 상세 응답 캐시의 적중/무효화 지표를 반환합니다."""
+    return perfume_detail_cache.stats()
\ No newline at end of file
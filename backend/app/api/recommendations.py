@@ -1,65 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
-from backend.app.database import get_db, Perfume, Recommendation
-from backend.app.schemas import RecommendationRequest, RecommendationResponse, RecommendationFeedback
-from backend.app.models.recommendation_model import PerfumeRecommendationModel
+from starlette.concurrency import run_in_threadpool
+from typing import List, TYPE_CHECKING
+from backend.app.database import get_db, SessionLocal, Perfume, Recommendation
+from backend.app.schemas import (
+    RecommendationRequest, RecommendationResponse, RecommendationFeedback,
+    BatchRecommendationRequest, BatchRecommendationResponse, BatchRecommendationItem
+)
+from backend.app.inference import InferenceOverloaded, create_inference_pool, create_micro_batcher
+from backend.app.model_loader import ModelLoader
+from backend.app.retrain_jobs import RetrainJobManager
+from backend.app.perfume_catalog import perfume_catalog
+from backend.app.recommendation_log import RecommendationPending, recommendation_log
+from backend.app.stage_metrics import stage_metrics
+import json
 import random
+import os
+import time
+
+if TYPE_CHECKING:
+    from backend.app.models.recommendation_model import PerfumeRecommendationModel
 
 router = APIRouter()
 
-# ML 모델 인스턴스 생성 및 로드
-recommendation_model = PerfumeRecommendationModel()
-try:
-    recommendation_model.load_model()
-    print("기존 멀티라벨 모델을 성공적으로 로드했습니다.")
-except Exception as e:
-    print(f"모델 로드 실패, 새로 훈련합니다: {e}")
-    recommendation_model.train()
+# 서빙 중인 ML 모델 (model_loader가 백그라운드에서 로드한 뒤 설정, 그 전에는 None)
+recommendation_model = None
+
+# 모델 추론 실행기 (INFERENCE_WORKERS > 0이면 전용 프로세스 풀, 대기 요청 상한 초과 시 503)
+inference_pool = create_inference_pool(recommendation_model)
+# 동시에 들어온 단건 요청을 짧은 시간 창 동안 모아 한 번에 추론하는 마이크로 배처
+inference_batcher = create_micro_batcher(inference_pool)
+
+# 백그라운드 재훈련 작업의 GridSearchCV 병렬 작업 수 (서빙 워커가 쓸 코어를 남겨 둠)
+RETRAIN_JOB_N_JOBS = int(os.getenv("RETRAIN_JOB_N_JOBS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+def _load_recommendation_model() -> "PerfumeRecommendationModel":
+    """
+    ML 모델 인스턴스를 생성하고 저장된 모델을 로드합니다 (없으면 새로 훈련).
+    sklearn/pandas를 가져오는 모델 모듈은 여기서 처음 import하므로 API 모듈 import 시간에 포함되지 않습니다.
+    """
+    from backend.app.models.recommendation_model import PerfumeRecommendationModel
+    model = PerfumeRecommendationModel()
+    try:
+        model.load_model()
+        print("기존 멀티라벨 모델을 성공적으로 로드했습니다.")
+    except Exception as e:
+        print(f"모델 로드 실패, 새로 훈련합니다: {e}")
+        model.train()
+    return model
+
+def _set_loaded_model(model: "PerfumeRecommendationModel"):
+    """처음 로드한 모델을 서빙 모델로 설정합니다 (그 사이 재훈련된 모델이 설정되었으면 그대로 둠)."""
+    global recommendation_model
+    if recommendation_model is not None:
+        return
+    inference_pool.swap_model(model)
+    recommendation_model = model
+
+# 워밍업에 쓰는 합성 프로필 (MODEL_WARMUP_PROFILES에 같은 형식의 JSON 배열로 바꿀 수 있음)
+DEFAULT_WARMUP_PROFILES = [
+    {'age': 25, 'gender': '여', 'mbti': 'ENFP', 'purpose': '자기만족', 'fashionstyle': '캐주얼', 'prefercolor': '흰색'},
+    {'age': 34, 'gender': '남', 'mbti': 'ISTJ', 'purpose': 'formal_occasion', 'fashionstyle': 'minimal', 'prefercolor': '검정'},
+    {'age': 45, 'gender': '여', 'mbti': 'INFJ', 'purpose': 'date_or_social', 'fashionstyle': 'chic', 'prefercolor': '분홍'},
+    {'age': 19, 'gender': '남', 'mbti': 'ESTP', 'purpose': 'special_event', 'fashionstyle': 'street', 'prefercolor': '파랑'},
+]
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() in ("1", "true", "yes")
+
+def _warmup_profiles() -> List[dict]:
+    profiles = json.loads(os.getenv("MODEL_WARMUP_PROFILES", "null")) or DEFAULT_WARMUP_PROFILES
+    return [_request_to_profile(RecommendationRequest(**profile)) for profile in profiles]
+
+def _warm_up_model(model: "PerfumeRecommendationModel") -> dict:
+    """
+    서빙 전에 메모리 매핑 파일을 페이지 캐시에 올리고, 합성 프로필로 단건/배치 예측과 카탈로그 조회를 한 번씩 실행해
+    지연 초기화(sklearn 트리 구성, 평탄화 예측기, 피처 인코더)와 캐시를 채웁니다. 단계별 소요 시간(ms)을 반환합니다.
+    """
+    timings = {}
+    start = time.perf_counter()
+    profiles = _warmup_profiles()
+
+    stage_start = time.perf_counter()
+    paged_bytes = model.page_in_artifacts()
+    timings['page_in_ms'] = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    for profile in profiles:
+        model.predict_categories(**profile)
+    timings['predict_ms'] = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    model.predict_categories_batch(profiles)
+    timings['predict_batch_ms'] = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        perfume_catalog.get_snapshot(db)
+    finally:
+        db.close()
+    timings['catalog_ms'] = (time.perf_counter() - stage_start) * 1000
+
+    timings['total_ms'] = (time.perf_counter() - start) * 1000
+    result = {'profiles': len(profiles), 'paged_bytes': paged_bytes, **{k: round(v, 2) for k, v in timings.items()}}
+    print(f"모델 워밍업 완료: {result}")
+    return result
+
+# 서버 시작 시(main.py) 백그라운드 로드를 시작하고, 그 전에 모델이 필요한 요청이 오면 그때 시작
+model_loader = ModelLoader(
+    _load_recommendation_model, on_ready=_set_loaded_model,
+    warmup_fn=_warm_up_model if MODEL_WARMUP else None
+)
+
+def _get_model() -> "PerfumeRecommendationModel":
+    """서빙 모델을 반환합니다 (아직 로드 중이면 503)."""
+    model = recommendation_model
+    if model is None:
+        model_loader.start()
+        raise HTTPException(
+            status_code=503,
+            detail="추천 모델을 불러오는 중입니다. 잠시 후 다시 시도해주세요",
+            headers={"Retry-After": "5"}
+        )
+    return model
+
+def _create_retrain_model() -> "PerfumeRecommendationModel":
+    from backend.app.models.recommendation_model import PerfumeRecommendationModel
+    model = PerfumeRecommendationModel()
+    model.train_n_jobs = RETRAIN_JOB_N_JOBS
+    # 서빙 모델의 GridSearchCV 결과를 넘겨 피드백 재훈련에서 재사용
+    if recommendation_model is not None:
+        model.set_search_state(recommendation_model.get_search_state())
+    return model
+
+def _swap_recommendation_model(new_model: "PerfumeRecommendationModel"):
+    """재훈련된 모델로 서빙 모델을 교체합니다 (참조 교체만 하므로 처리 중인 요청은 이전 모델로 끝남)."""
+    global recommendation_model
+    inference_pool.swap_model(new_model)
+    recommendation_model = new_model
+    print("재훈련된 모델로 교체했습니다.")
+
+retrain_jobs = RetrainJobManager(
+    model_factory=_create_retrain_model,
+    session_factory=SessionLocal,
+    on_success=_swap_recommendation_model
+)
+
+# 배치 추천 한 번에 받을 수 있는 최대 프로필 수
+BATCH_MAX_PROFILES = int(os.getenv("RECOMMENDATION_BATCH_MAX_PROFILES", "50000"))
+
+def _request_to_profile(request: RecommendationRequest) -> dict:
+    """추천 요청의 빈 값을 기본값으로 채운 사용자 프로필을 반환합니다."""
+    return {
+        'age': request.age if request.age else 25,
+        'gender': request.gender if request.gender else "남",
+        'mbti': request.mbti if request.mbti else "ISTJ",
+        'purpose': request.purpose if request.purpose else "자기만족",
+        'fashionstyle': request.fashionstyle if request.fashionstyle else "캐주얼",
+        'prefercolor': request.prefercolor if request.prefercolor else "흰색",
+    }
+
+def _overloaded_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="추천 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요",
+        headers={"Retry-After": "1"}
+    )
 
 @router.post("/", response_model=RecommendationResponse)
-def get_recommendation(request: RecommendationRequest, db: Session = Depends(get_db)):
+async def get_recommendation(request: RecommendationRequest, db: Session = Depends(get_db)):
     """사용자 선호도에 따른 향수를 추천합니다 (멀티라벨)."""
+    model = _get_model()
     # 입력 데이터 검증 및 기본값 설정
-    age = request.age if request.age else 25
-    gender = request.gender if request.gender else "남"
-    mbti = request.mbti if request.mbti else "ISTJ"
-    purpose = request.purpose if request.purpose else "자기만족"
-    fashionstyle = request.fashionstyle if request.fashionstyle else "캐주얼"
-    prefercolor = request.prefercolor if request.prefercolor else "흰색"
-
-    # ML 모델로 향수 카테고리들 예측 (멀티라벨)
-    predicted_categories, confidence = recommendation_model.predict_categories(
-        age=age,
-        gender=gender,
-        mbti=mbti,
-        purpose=purpose,
-        fashionstyle=fashionstyle,
-        prefercolor=prefercolor
-    )
+    profile = _request_to_profile(request)
+
+    # ML 모델로 향수 카테고리들 예측 (멀티라벨, 이벤트 루프 밖의 추론 실행기에서 수행)
+    # inference 단계는 배치 대기와 추론 실행기 안의 전처리/인코딩/예측을 모두 포함
+    try:
+        with stage_metrics.timer("inference"):
+            predicted_categories, confidence = await inference_batcher.predict(profile)
+    except InferenceOverloaded:
+        raise _overloaded_error()
+
+    # 향수 선택과 추천 기록 저장은 동기 DB 작업이므로 스레드풀에서 실행
+    return await run_in_threadpool(_recommend_perfume, model, db, profile, predicted_categories, confidence)
 
-    print(f"[DEBUG] predicted_categories: {predicted_categories}")
-    print(f"[DEBUG] confidence: {confidence}")
+def _recommend_perfume(model, db: Session, profile: dict, predicted_categories, confidence: dict) -> RecommendationResponse:
+    """예측된 카테고리로 향수를 고르고 추천 기록을 저장합니다."""
+    age = profile['age']
+    gender = profile['gender']
+    mbti = profile['mbti']
 
     # 예측된 카테고리들 중 하나를 선택하여 향수 추천
     if predicted_categories:
         selected_category = predicted_categories[0]
     else:
         selected_category = max(confidence, key=confidence.get) if confidence else "citrus"
-    query = db.query(Perfume).filter(Perfume.category == selected_category)
-    perfumes = query.all()
-    if not perfumes and len(predicted_categories) > 1:
-        for category in predicted_categories[1:]:
-            perfumes = db.query(Perfume).filter(Perfume.category == category).all()
-            if perfumes:
-                selected_category = category
-                break
-    if not perfumes:
-        perfumes = db.query(Perfume).all()
-        if not perfumes:
-            raise HTTPException(status_code=404, detail="적합한 향수를 찾을 수 없습니다")
-    selected_perfume = random.choice(perfumes)
-    reason = recommendation_model.get_recommendation_reason(
+    # 메모리 카탈로그에서 선택: 첫 카테고리에 향수가 없으면 나머지 예측 카테고리, 그래도 없으면 전체 향수에서 고름
+    candidate_categories = [selected_category] + list(predicted_categories[1:])
+    with stage_metrics.timer("catalog_choose"):
+        chosen = perfume_catalog.choose(db, candidate_categories)
+    if chosen is None:
+        raise HTTPException(status_code=404, detail="적합한 향수를 찾을 수 없습니다")
+    selected_category, selected_perfume = chosen
+    reason = model.get_recommendation_reason(
         predicted_categories=predicted_categories,
         age=age,
         gender=gender,
@@ -70,20 +213,20 @@ def get_recommendation(request: RecommendationRequest, db: Session = Depends(get
     # DB에는 float만 저장 (가장 높은 confidence 값)
     confidence_score = max(confidence.values()) if confidence else 0.0
 
-    db_recommendation = Recommendation(
-        perfume_id=selected_perfume.id,
-        confidence_score=confidence_score,
-        reason=reason
-    )
-    db.add(db_recommendation)
-    db.commit()
-    db.refresh(db_recommendation)
+    # 추천 기록은 write-behind 로그에 넣고 바로 응답 (ID는 미리 예약된 블록에서 할당, 저장은 백그라운드에서 일괄 처리)
+    with stage_metrics.timer("recommendation_record"):
+        recommendation_id = recommendation_log.record(
+            perfume_id=selected_perfume.id,
+            confidence_score=confidence_score,
+            reason=reason
+        )
 
     # 노트별 추천 향조 추출
-    notes_recommendation = recommendation_model.recommend_notes_by_confidence(confidence)
+    with stage_metrics.timer("recommend_notes"):
+        notes_recommendation = model.recommend_notes_by_confidence(confidence)
 
     return RecommendationResponse(
-        id=db_recommendation.id,
+        id=recommendation_id,
         perfume=selected_perfume,
         predicted_categories=predicted_categories,
         confidence_score=confidence_score,
@@ -93,6 +236,36 @@ def get_recommendation(request: RecommendationRequest, db: Session = Depends(get
         notes_recommendation=notes_recommendation
     )
 
+@router.post("/batch", response_model=BatchRecommendationResponse)
+async def get_batch_recommendations(request: BatchRecommendationRequest):
+    """여러 사용자 프로필의 향수 카테고리를 한 번의 모델 추론으로 예측합니다 (추천 기록은 저장하지 않음)."""
+    if len(request.profiles) > BATCH_MAX_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {BATCH_MAX_PROFILES}개의 프로필까지 요청할 수 있습니다"
+        )
+    model = _get_model()
+    profiles = [_request_to_profile(profile) for profile in request.profiles]
+    try:
+        predictions = await inference_pool.predict_batch(profiles)
+    except InferenceOverloaded:
+        raise _overloaded_error()
+    # 프로필별 노트 추천과 응답 직렬화도 이벤트 루프를 막지 않도록 스레드풀에서 수행
+    body = await run_in_threadpool(_build_batch_response_body, model, predictions)
+    return Response(content=body, media_type="application/json")
+
+def _build_batch_response_body(model, predictions: List[tuple]) -> bytes:
+    """배치 예측 결과에 노트 추천을 붙여 JSON 응답 본문을 만듭니다."""
+    results = [
+        BatchRecommendationItem(
+            predicted_categories=list(predicted_categories),
+            confidence_dict=confidence,
+            notes_recommendation=model.recommend_notes_by_confidence(confidence)
+        )
+        for predicted_categories, confidence in predictions
+    ]
+    return BatchRecommendationResponse(results=results).model_dump_json().encode("utf-8")
+
 @router.post("/feedback/{recommendation_id}")
 def submit_recommendation_feedback(
     recommendation_id: int, 
@@ -100,6 +273,17 @@ def submit_recommendation_feedback(
     db: Session = Depends(get_db)
 ):
     """추천에 대한 피드백을 제출합니다."""
+    # 아직 저장되지 않은 추천이면 대기 중인 기록에 반영
+    try:
+        if recommendation_log.set_feedback(recommendation_id, feedback.is_liked):
+            return {"message": "피드백이 저장되었습니다"}
+    except RecommendationPending:
+        raise HTTPException(
+            status_code=503,
+            detail="추천 기록을 저장하는 중입니다. 잠시 후 다시 시도해주세요",
+            headers={"Retry-After": "1"}
+        )
+
     # 추천 기록 조회
     recommendation = db.query(Recommendation).filter(
         Recommendation.id == recommendation_id
@@ -134,12 +318,46 @@ def get_popular_perfumes(db: Session = Depends(get_db)):
     # 예시: 단순히 랜덤 5개 반환
     return random.sample(perfumes, min(5, len(perfumes)))
 
-@router.post("/retrain-model")
-def retrain_model_with_feedback(db: Session = Depends(get_db)):
-    recommendation_model.retrain_with_feedback(db)
-    return {"message": "멀티라벨 모델이 피드백을 반영하여 재학습되었습니다."}
+@router.post("/retrain-model", status_code=202)
+def retrain_model_with_feedback():
+    """피드백을 반영한 재훈련을 백그라운드 작업으로 시작하고 작업 ID를 바로 반환합니다."""
+    job = retrain_jobs.submit()
+    return {"message": "멀티라벨 모델 재학습 작업이 시작되었습니다.", **job.to_dict()}
+
+@router.get("/retrain-model/{job_id}")
+def get_retrain_job_status(job_id: str):
+    """재훈련 작업의 상태(단계, 진행률, 오류)를 반환합니다."""
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="재훈련 작업을 찾을 수 없습니다")
+    return job.to_dict()
 
 @router.get("/model-status")
 def get_model_status():
-    status = recommendation_model.should_retrain()
-    return {"should_retrain": status} 
\ No newline at end of file
+    status = _get_model().should_retrain()
+    return {"should_retrain": status}
+
+@router.get("/cache-stats")
+def get_prediction_cache_stats():
+    """예측 결과 캐시의 적중/미스/제거 카운터를 반환합니다."""
+    return _get_model().prediction_cache.stats()
+
+@router.get("/table-stats")
+def get_prediction_table_stats():
+    """사전 계산 예측 테이블의 크기와 조회 적중률을 반환합니다."""
+    return _get_model().prediction_table_stats()
+
+@router.get("/catalog-stats")
+def get_perfume_catalog_stats():
+    """추천용 향수 카탈로그의 로드/무효화 카운터를 반환합니다."""
+    return perfume_catalog.stats()
+
+@router.get("/log-stats")
+def get_recommendation_log_stats():
+    """추천 기록 write-behind 로그의 대기/저장 지표를 반환합니다."""
+    return recommendation_log.stats()
+
+@router.get("/inference-stats")
+def get_inference_stats():
+    """추론 실행기와 마이크로 배처의 대기열/배치 지표를 반환합니다."""
+    return {"pool": inference_pool.stats(), "batcher": inference_batcher.stats()} 
\ No newline at end of file
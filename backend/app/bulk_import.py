@@ -0,0 +1,197 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from backend.app.database import Perfume, PerfumeRecipe
+from backend.app.schemas import PerfumeBulkItem
+
+# 파싱된 한 행: (행 번호, 원본 dict 또는 None, 파싱 오류 메시지 또는 None)
+ParsedRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """요청 본문 스트림을 줄 단위 문자열로 나눕니다 (\n 기준, 줄바꿈 포함, UTF-8 BOM 제거)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """NDJSON: 한 줄에 향수 하나 (JSON 객체, recipes 배열 포함 가능). 빈 줄은 건너뜁니다."""
+    row_number = 0
+    async for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"JSON 형식 오류: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "각 줄은 JSON 객체여야 합니다"
+            continue
+        yield row_number, data, None
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """
+    CSV: 첫 줄은 헤더, recipes 컬럼에는 제조법 JSON 배열을 넣을 수 있습니다.
+    따옴표 안의 줄바꿈을 지원하기 위해 따옴표 개수가 짝수가 될 때까지 줄을 모아 한 레코드로 읽습니다.
+    """
+    header = None
+    row_number = 0
+    record = ""
+    async for line in lines:
+        record += line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"컬럼 수가 헤더와 다릅니다 ({len(values)}개, 헤더 {len(header)}개)"
+            continue
+        data = dict(zip(header, values))
+        recipes = data.get("recipes")
+        if recipes is not None:
+            try:
+                data["recipes"] = json.loads(recipes) if recipes.strip() else []
+            except json.JSONDecodeError as e:
+                yield row_number, None, f"recipes JSON 형식 오류: {e}"
+                continue
+        yield row_number, data, None
+    if record.strip():
+        yield row_number + 1, None, "닫히지 않은 따옴표가 있습니다"
+
+
+class BulkImportResult:
+    """대량 등록 결과 집계 (오류는 max_errors개까지만 행별로 보관)."""
+
+    def __init__(self, max_errors: int = 1000):
+        self.max_errors = max_errors
+        self.received = 0
+        self.created = 0
+        self.recipes_created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors: List[Dict] = []
+
+    def add_error(self, row: int, error: str, name: Optional[str] = None):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "name": name, "error": error})
+
+    def to_dict(self) -> Dict:
+        return {
+            "received": self.received,
+            "created": self.created,
+            "recipes_created": self.recipes_created,
+            "duplicates": self.duplicates,
+            "failed": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _insert_items(db: Session, items: List[Tuple[int, PerfumeBulkItem]]) -> int:
+    """검증된 향수들과 제조법을 executemany로 삽입하고 제조법 수를 반환합니다 (커밋은 호출 측)."""
+    perfume_rows = [item.model_dump(exclude={"recipes"}) for _, item in items]
+    db.execute(insert(Perfume), perfume_rows)
+    names = [row["name"] for row in perfume_rows]
+    # 향수명은 unique이므로 이름으로 새 ID를 조회 (RETURNING을 지원하지 않는 MySQL 포함)
+    ids = dict(db.execute(select(Perfume.name, Perfume.id).where(Perfume.name.in_(names))).all())
+    recipe_rows = [
+        {"perfume_id": ids[item.name], **recipe.model_dump()}
+        for _, item in items
+        for recipe in item.recipes
+    ]
+    if recipe_rows:
+        db.execute(insert(PerfumeRecipe), recipe_rows)
+    return len(recipe_rows)
+
+
+def import_chunk(db: Session, rows: Iterable[ParsedRow], seen_names: Set[str], result: BulkImportResult):
+    """
+    파싱된 행 묶음 하나를 검증하고 중복을 걸러낸 뒤 한 번의 트랜잭션으로 삽입합니다.
+    묶음 삽입이 실패하면 (동시 등록 등) 행마다 따로 삽입해 실패한 행만 오류로 남깁니다.
+    """
+    items: List[Tuple[int, PerfumeBulkItem]] = []
+    for row_number, data, parse_error in rows:
+        result.received += 1
+        if parse_error is not None:
+            result.add_error(row_number, parse_error)
+            continue
+        try:
+            item = PerfumeBulkItem.model_validate(data)
+        except ValidationError as e:
+            result.add_error(row_number, _validation_message(e), data.get("name") if isinstance(data, dict) else None)
+            continue
+        if item.name in seen_names:
+            result.duplicates += 1
+            result.add_error(row_number, "요청 안에서 중복된 향수명입니다", item.name)
+            continue
+        seen_names.add(item.name)
+        items.append((row_number, item))
+    if not items:
+        return
+
+    # 이미 등록된 향수명은 한 번의 쿼리로 확인
+    existing = set(db.execute(
+        select(Perfume.name).where(Perfume.name.in_([item.name for _, item in items]))
+    ).scalars())
+    new_items = []
+    for row_number, item in items:
+        if item.name in existing:
+            result.duplicates += 1
+            result.add_error(row_number, "이미 등록된 향수명입니다", item.name)
+        else:
+            new_items.append((row_number, item))
+    if not new_items:
+        return
+
+    try:
+        recipes_created = _insert_items(db, new_items)
+        db.commit()
+    except Exception:
+        db.rollback()
+    else:
+        result.created += len(new_items)
+        result.recipes_created += recipes_created
+        return
+
+    for row_number, item in new_items:
+        try:
+            recipes_created = _insert_items(db, [(row_number, item)])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            result.add_error(row_number, f"저장 실패: {e.__class__.__name__}: {e}", item.name)
+        else:
+            result.created += 1
+            result.recipes_created += recipes_created
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, Index, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -8,7 +9,56 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'perfume_recommendation.db')}")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# 커넥션 풀 설정 (SQLite 외 DB: MySQL/PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # MySQL wait_timeout보다 짧게
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+
+# SQLite 설정: WAL 모드에서는 읽기와 쓰기가 서로를 막지 않음
+SQLITE_WAL = _env_flag("SQLITE_WAL", "true")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _is_sqlite_memory(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+def _engine_options(url: str) -> dict:
+    """URL의 DB 종류에 맞는 create_engine / create_async_engine 옵션을 반환합니다."""
+    if _is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}} if make_url(url).get_driver_name() == "pysqlite" else {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """SQLite 연결마다 WAL/동기화/mmap/잠금 대기 PRAGMA를 적용합니다."""
+    cursor = dbapi_connection.cursor()
+    if SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def _configure_engine(sync_engine, url: str):
+    if _is_sqlite(url) and not _is_sqlite_memory(url):
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return sync_engine
+
+engine = _configure_engine(create_engine(DATABASE_URL, **_engine_options(DATABASE_URL)), DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -21,6 +71,50 @@ def get_db():
     finally:
         db.close()
 
+# 비동기 DB 드라이버 (ASYNC_DATABASE_URL이 없으면 DATABASE_URL의 드라이버를 바꿔 사용)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+asyncmy",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url() -> str:
+    url = os.getenv("ASYNC_DATABASE_URL")
+    if url:
+        return url
+    sync_url = make_url(DATABASE_URL)
+    backend = sync_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"{backend} DB의 비동기 드라이버를 알 수 없습니다. ASYNC_DATABASE_URL을 설정하세요.")
+    return sync_url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine():
+    """
+    비동기 엔진을 처음 사용할 때 만듭니다 (aiosqlite/asyncmy 등 비동기 드라이버가 필요하므로 지연 생성).
+    풀 설정과 SQLite PRAGMA는 동기 엔진과 동일하게 적용됩니다.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        url = get_async_database_url()
+        async_engine = create_async_engine(url, **_engine_options(url))
+        _configure_engine(async_engine.sync_engine, url)
+        _async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        _async_engine = async_engine
+    return _async_engine
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_session_factory()
+
+# 비동기 데이터베이스 세션 의존성 (async 엔드포인트에서 스레드풀을 쓰지 않고 DB I/O를 await)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # 향수 모델
 class Perfume(Base):
     __tablename__ = "perfumes"
@@ -28,7 +122,7 @@ class Perfume(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, index=True)
     brand = Column(String(100))
-    category = Column(String(50))  # "floral", "woody", "fresh", "oriental", "citrus"
+    category = Column(String(50), index=True)  # "floral", "woody", "fresh", "oriental", "citrus"
     top_notes = Column(Text)
     middle_notes = Column(Text)
     base_notes = Column(Text)
@@ -64,4 +158,23 @@ class Recommendation(Base):
     confidence_score = Column(Float)
     reason = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
-    is_liked = Column(Boolean, nullable=True)  # 사용자 피드백 
\ No newline at end of file
+    is_liked = Column(Boolean, nullable=True)  # 사용자 피드백
+
+    __table_args__ = (
+        # 피드백 학습 데이터 조회 (is_liked = true AND created_at > 마지막 재훈련 시각)
+        Index("ix_recommendations_is_liked_created_at", "is_liked", "created_at"),
+        # 스케줄러의 새 피드백 개수 확인 (is_liked IS NOT NULL AND created_at > 마지막 재훈련 시각)
+        # 부분 인덱스를 지원하지 않는 DB(MySQL)에서는 created_at 일반 인덱스로 생성됨
+        Index(
+            "ix_recommendations_feedback_created_at", "created_at",
+            sqlite_where=text("is_liked IS NOT NULL"),
+            postgresql_where=text("is_liked IS NOT NULL")
+        ),
+    )
+
+# ID 시퀀스 (DB 왕복 없이 쓸 ID를 블록 단위로 미리 예약, 예: 추천 기록 write-behind)
+class IdSequence(Base):
+    __tablename__ = "id_sequences"
+    
+    name = Column(String(50), primary_key=True)  # 시퀀스 이름 (테이블명)
+    next_value = Column(Integer, nullable=False)  # 아직 예약되지 않은 첫 ID
\ No newline at end of file
@@ -0,0 +1,277 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.stage_metrics import current_request_timings, merge_request_timings, start_request_timings
+
+# 워커 프로세스마다 한 번만 로드되는 모델 (initializer에서 설정)
+_worker_model = None
+
+
+def _init_worker(model_filepath: str):
+    """워커 프로세스 시작 시 저장된 모델을 한 번만 로드합니다."""
+    global _worker_model
+    from backend.app.models.recommendation_model import PerfumeRecommendationModel
+    model = PerfumeRecommendationModel()
+    model.model_filepath = model_filepath
+    model.load_model()
+    if not model.is_trained:
+        # 초기화 실패로 풀이 BrokenProcessPool이 되어 swap_model이 교체를 취소하도록 함
+        raise RuntimeError(f"워커에서 모델을 로드하지 못했습니다: {model_filepath}")
+    _worker_model = model
+
+
+def _worker_ready(delay: float) -> int:
+    """워커가 모델을 로드했는지 확인하기 위한 작업 (여러 워커가 나눠 받도록 잠시 대기)."""
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _worker_predict(profile: Dict) -> tuple:
+    return _worker_model.predict_categories(**profile)
+
+
+def _worker_predict_batch(profiles: List[Dict], use_cache: bool = False) -> List[tuple]:
+    return _worker_model.predict_categories_batch(profiles, use_cache=use_cache)
+
+
+class InferenceOverloaded(Exception):
+    """대기 중인 추론 요청이 상한을 넘었을 때 발생합니다 (API에서는 503으로 응답)."""
+
+
+class InferencePool:
+    """
+    추천 모델 추론을 이벤트 루프 밖에서 실행하는 실행기.
+    workers > 0이면 모델을 한 번씩 로드한 전용 프로세스 풀에서, 0이면 현재 프로세스의 스레드에서 추론합니다.
+    처리 중이거나 대기 중인 요청이 max_pending을 넘으면 InferenceOverloaded를 발생시켜 부하를 되돌립니다.
+    """
+
+    def __init__(self, model, workers: int = 0, max_pending: int = 64):
+        self.model = model
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _create_executor(self, model) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model.model_filepath,),
+        )
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor(self.model)
+            return self._executor
+
+    def swap_model(self, model):
+        """
+        서빙 모델을 새 모델로 교체합니다.
+        프로세스 풀을 쓰는 경우 새 모델을 로드한 워커들을 먼저 띄워 둔 뒤 풀을 바꾸고,
+        이전 풀은 이미 받은 요청을 마저 처리한 후 종료되도록 합니다.
+        새 워커가 모델을 로드하지 못하면 (BrokenProcessPool 등) 새 풀을 닫고 기존 풀과 모델을 유지한 채 예외를 다시 발생시킵니다.
+        """
+        new_executor = None
+        if self.workers > 0:
+            new_executor = self._create_executor(model)
+            try:
+                futures = [new_executor.submit(_worker_ready, 0.1) for _ in range(self.workers)]
+                wait(futures)
+                for future in futures:
+                    future.result()
+            except Exception:
+                new_executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        with self._lock:
+            old_executor, self._executor = self._executor, new_executor
+            self.model = model
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise InferenceOverloaded(f"대기 중인 추론 요청이 {self.max_pending}개를 넘었습니다")
+            self.pending += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+
+    async def predict(self, profile: Dict) -> tuple:
+        """프로필 하나의 (predicted_categories, confidences)를 반환합니다."""
+        self._acquire()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return await run_in_threadpool(self.model.predict_categories, **profile)
+            return await asyncio.get_running_loop().run_in_executor(executor, _worker_predict, profile)
+        finally:
+            self._release()
+
+    async def predict_batch(self, profiles: List[Dict], use_cache: bool = False) -> List[tuple]:
+        """여러 프로필을 한 번의 행렬 추론으로 예측합니다."""
+        self._acquire()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return await run_in_threadpool(self.model.predict_categories_batch, profiles, use_cache)
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, _worker_predict_batch, profiles, use_cache
+            )
+        finally:
+            self._release()
+
+    def shutdown(self, wait: bool = True):
+        """프로세스 풀을 종료합니다."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'rejected': self.rejected,
+        }
+
+
+class MicroBatcher:
+    """
+    동시에 들어온 단건 추천 요청을 짧은 시간 창(window_ms) 동안 모아 한 번의 행렬 추론으로 처리하고,
+    결과를 기다리던 요청들에 나눠 돌려줍니다. 모인 요청이 max_batch_size에 도달하면 시간 창을 기다리지 않습니다.
+    window_ms가 0 이하이면 요청마다 바로 단건 추론합니다.
+    배치 작업은 요청과 별도의 컨텍스트에서 실행되므로, 배치 안의 모델 단계(preprocess_input, encode_features, predict) 시간은
+    배치 전체의 소요 시간으로 한 번 기록되어 배치에 속한 모든 요청의 Server-Timing에 더해집니다.
+    """
+
+    def __init__(self, pool: InferencePool, window_ms: float = 2.0, max_batch_size: int = 32,
+                 max_queue_depth: int = 1024):
+        self.pool = pool
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.max_queue_depth = max_queue_depth
+        self._queue = []  # (profile, future, 요청의 단계 시간 dict 또는 None)
+        self._timer = None
+        self._tasks = set()  # 실행 중인 배치 작업 (GC 방지용 참조)
+        # 관측용 지표
+        self.in_flight = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_observed_batch_size = 0
+        self.size_flushes = 0
+        self.window_flushes = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0 and self.max_batch_size > 1
+
+    async def predict(self, profile: Dict) -> tuple:
+        """프로필 하나의 (predicted_categories, confidences)를 반환합니다."""
+        if not self.enabled:
+            return await self.pool.predict(profile)
+        if len(self._queue) + self.in_flight >= self.max_queue_depth:
+            self.rejected += 1
+            raise InferenceOverloaded(f"배치 대기열이 {self.max_queue_depth}개를 넘었습니다")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((profile, future, current_request_timings()))
+        if len(self._queue) >= self.max_batch_size:
+            self.size_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000.0, self._on_window_elapsed)
+        return await future
+
+    def _on_window_elapsed(self):
+        self._timer = None
+        if self._queue:
+            self.window_flushes += 1
+            self._flush()
+
+    def _flush(self):
+        """대기 중인 요청을 max_batch_size씩 묶어 추론 작업으로 보냅니다."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            self.in_flight += len(batch)
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[tuple]):
+        self.batches += 1
+        self.batched_requests += len(batch)
+        self.max_observed_batch_size = max(self.max_observed_batch_size, len(batch))
+        # 배치를 시작한 요청의 컨텍스트를 복사해 실행되므로, 모델 단계 시간을 그 요청에만 기록하지 않도록 배치용 dict를 따로 둠
+        batch_timings = start_request_timings()
+        try:
+            results = await self.pool.predict_batch([profile for profile, _, _ in batch], use_cache=True)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, timings), result in zip(batch, results):
+                merge_request_timings(timings, batch_timings)
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.in_flight -= len(batch)
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'window_ms': self.window_ms,
+            'max_batch_size': self.max_batch_size,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_depth': len(self._queue),
+            'in_flight': self.in_flight,
+            'batches': self.batches,
+            'batched_requests': self.batched_requests,
+            'avg_batch_size': self.batched_requests / self.batches if self.batches else 0.0,
+            'max_observed_batch_size': self.max_observed_batch_size,
+            'size_flushes': self.size_flushes,
+            'window_flushes': self.window_flushes,
+            'rejected': self.rejected,
+        }
+
+
+def create_micro_batcher(pool: InferencePool) -> MicroBatcher:
+    """환경 변수 설정으로 마이크로 배처를 생성합니다."""
+    return MicroBatcher(
+        pool,
+        window_ms=float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "2")),
+        max_batch_size=int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "32")),
+        max_queue_depth=int(os.getenv("INFERENCE_BATCH_MAX_QUEUE", "1024")),
+    )
+
+
+def create_inference_pool(model) -> InferencePool:
+    """환경 변수 설정으로 추론 실행기를 생성합니다."""
+    return InferencePool(
+        model,
+        workers=int(os.getenv("INFERENCE_WORKERS", "0")),
+        max_pending=int(os.getenv("INFERENCE_MAX_PENDING", "64")),
+    )
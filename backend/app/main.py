@@ -1,7 +1,12 @@
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from backend.app.api import perfumes, recommendations
 from backend.app.database import engine, Base
+from backend.app.recommendation_log import recommendation_log
+from backend.app.stage_metrics import format_server_timing, stage_metrics, start_request_timings
 
 # 데이터베이스 테이블 생성
 Base.metadata.create_all(bind=engine)
@@ -30,14 +35,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답에 단계별 소요 시간(Server-Timing 헤더)을 붙일지 여부 (브라우저 개발자 도구에서 확인 가능)
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "false").lower() in ("1", "true", "yes")
+
+if SERVER_TIMING_HEADER:
+    @app.middleware("http")
+    async def add_server_timing_header(request: Request, call_next):
+        timings = start_request_timings()
+        response = await call_next(request)
+        if timings:
+            response.headers["Server-Timing"] = format_server_timing(timings)
+        return response
+
 # API 라우터 등록
 app.include_router(perfumes.router, prefix="/api/perfumes", tags=["perfumes"])
 app.include_router(recommendations.router, prefix="/api/recommendations", tags=["recommendations"])
 
+@app.on_event("startup")
+def start_model_loading():
+    # 모델 로드(모델 파일이 없으면 훈련)는 백그라운드에서 진행하고 서버는 바로 요청을 받음
+    recommendations.model_loader.start()
+
+@app.on_event("shutdown")
+def shutdown_inference_pool():
+    recommendations.inference_pool.shutdown()
+
+@app.on_event("shutdown")
+def flush_recommendation_log():
+    # 아직 저장되지 않은 추천 기록을 모두 저장
+    recommendation_log.close()
+
 @app.get("/")
 async def root():
     return {"message": "향수 추천 API에 오신 것을 환영합니다!"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    # 프로세스 생존 여부(status)와 추천 모델 준비 여부(model.ready)를 따로 보고
+    return {"status": "healthy", "model": recommendations.model_loader.status()}
+
+@app.get("/ready")
+async def readiness_check():
+    # 추천 모델 로드와 워밍업이 끝나야 200 (그 전에는 503이므로 배포 시 트래픽을 보내지 않음)
+    model_loader = recommendations.model_loader
+    model_loader.start()
+    status = model_loader.status()
+    return JSONResponse(status_code=200 if status['ready'] else 503, content=jsonable_encoder(status))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # 추천 요청 단계별 소요 시간 히스토그램 (Prometheus 텍스트 형식)
+    return PlainTextResponse(stage_metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,84 @@
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+class ModelLoader:
+    """
+    추천 모델을 백그라운드 스레드에서 한 번 로드합니다.
+    API 프로세스는 모델 로드(모델 파일이 없으면 전체 훈련)를 기다리지 않고 바로 요청을 받을 수 있고,
+    로드가 끝나면 warmup_fn(model)으로 캐시와 메모리 매핑 파일을 데운 뒤 on_ready(model)로 서빙 모델을 설정합니다.
+    워밍업은 최선 노력으로 실행하며, 실패해도 오류만 기록하고 준비 상태로 넘어갑니다.
+    상태: pending -> loading -> warming_up -> ready / failed
+    """
+
+    def __init__(self, load_fn: Callable[[], object], on_ready: Callable[[object], None],
+                 warmup_fn: Optional[Callable[[object], Dict]] = None):
+        self.load_fn = load_fn
+        self.on_ready = on_ready
+        self.warmup_fn = warmup_fn
+        self.warmup = None  # 워밍업 결과 (단계별 소요 시간 등)
+        self.state = "pending"
+        self.started_at = None
+        self.ready_at = None
+        self.load_seconds = None
+        self.error = None
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self):
+        """로드를 시작합니다 (이미 시작했으면 아무것도 하지 않음)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = "loading"
+            self.started_at = datetime.utcnow()
+            self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        start = time.monotonic()
+        try:
+            model = self.load_fn()
+            if self.warmup_fn is not None:
+                self.state = "warming_up"
+                try:
+                    self.warmup = self.warmup_fn(model)
+                except Exception as e:
+                    traceback.print_exc()
+                    self.warmup = {'error': f"{e.__class__.__name__}: {e}"}
+            self.on_ready(model)
+        except Exception as e:
+            traceback.print_exc()
+            self.error = f"{e.__class__.__name__}: {e}"
+            self.state = "failed"
+        else:
+            self.ready_at = datetime.utcnow()
+            self.state = "ready"
+        finally:
+            self.load_seconds = time.monotonic() - start
+            self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """로드가 끝날 때까지 기다리고 성공 여부를 반환합니다."""
+        self.start()
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self) -> Dict:
+        return {
+            'state': self.state,
+            'ready': self.ready,
+            'started_at': self.started_at,
+            'ready_at': self.ready_at,
+            'load_seconds': self.load_seconds,
+            'error': self.error,
+            'warmup': self.warmup,
+        }
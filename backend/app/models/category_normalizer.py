@@ -0,0 +1,105 @@
+import re
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+
+# 명확성과 유지보수성을 위해 재구성된 매핑 규칙
+# 유사 카테고리를 통합하고, 긴 키워드를 우선적으로 매칭합니다.
+CATEGORY_KEYWORD_MAP = {
+    # Floral 계열 (통합)
+    '화이트 플로럴': 'floral', '라이트 플로럴': 'floral', '플로럴': 'floral', 'white floral': 'floral', 'light floral': 'floral',
+    '장미': 'floral', 'rose': 'floral', '자스민': 'floral', '백합': 'floral', '꽃': 'floral',
+    # Woody 계열 (통합)
+    '우디': 'woody', '우드': 'woody', '나무': 'woody', '샌달우드': 'woody', '시더우드': 'woody', '숲': 'woody', '오리엔탈': 'woody', '신비': 'woody',
+    # Citrus 계열
+    '시트러스': 'citrus', '상큼': 'citrus', '레몬': 'citrus', '자몽': 'citrus', '베르가못': 'citrus',
+    # 기타 주요 카테고리 (한글/영문/유사어 포함)
+    '머스크': 'musk', '포근': 'musk',
+    '아쿠아틱': 'aquatic', '바다': 'aquatic', '비누': 'aquatic',
+    '그린': 'green', '풀': 'green', '허브': 'green', '스파이시': 'green', '후추': 'green',
+    '아로마틱': 'aromatic', '라벤더': 'aromatic',
+    '프루티': 'fruity', '과일': 'fruity',
+    '구르망': 'gourmand', '달콤': 'gourmand', '바닐라': 'gourmand',
+    '파우더리': 'powdery', '파우더': 'powdery',
+    '시프레': 'chypre', '푸제르': 'fougere', '앰버': 'amber',
+    '캐쥬얼': 'casual', '일상': 'casual',
+    '코지': 'cozy', '커피': 'cozy',
+}
+
+
+class CategoryNormalizer:
+    """
+    복합 향수 카테고리 문자열을 표준 카테고리(영문) 리스트로 변환하는 정규화기.
+    매핑과 정규식은 한 번만 만들고, 같은 조각/문자열의 결과는 캐시해 재사용합니다.
+
+    키워드는 긴 것부터(길이가 같으면 매핑 순서대로) 우선순위를 가지며, 조각 안에 포함된 키워드 중
+    우선순위가 가장 높은 것 하나로 매핑됩니다. 위치마다 우선순위 순서의 lookahead 대안으로 매칭해
+    각 위치에서 가장 높은 키워드를 찾고, 그중 최고 우선순위를 고릅니다.
+    """
+
+    SPLIT_RE = re.compile(r'[,/]')
+    PAREN_RE = re.compile(r'\([^)]*\)')  # 괄호와 내용 제거
+    SPECIAL_RE = re.compile(r'[^\w가-힣 ]')  # 특수문자 제거
+
+    def __init__(self, mapping: Dict[str, str]):
+        # 긴 키워드가 먼저 매칭되도록 정렬 (e.g., '화이트 플로럴'이 '플로럴'보다 먼저)
+        self.keys = sorted(mapping.keys(), key=len, reverse=True)
+        self.categories = [mapping[key] for key in self.keys]
+        self.rank = {key: i for i, key in enumerate(self.keys)}
+        self.keyword_re = re.compile('(?=(' + '|'.join(re.escape(key) for key in self.keys) + '))')
+        self._fragment_cache: Dict[str, object] = {}
+        self._text_cache: Dict[str, Tuple[str, ...]] = {}
+
+    def clean_label(self, label) -> str:
+        label = str(label)
+        label = self.PAREN_RE.sub('', label)
+        label = self.SPECIAL_RE.sub('', label)
+        return label.strip().lower()
+
+    def _match_fragment(self, cleaned: str):
+        """정리된 조각에서 우선순위가 가장 높은 키워드의 카테고리를 반환합니다 (없으면 None)."""
+        try:
+            return self._fragment_cache[cleaned]
+        except KeyError:
+            pass
+        ranks = [self.rank[match.group(1)] for match in self.keyword_re.finditer(cleaned)]
+        category = self.categories[min(ranks)] if ranks else None
+        self._fragment_cache[cleaned] = category
+        return category
+
+    def _normalize_text(self, text: str) -> Tuple[str, ...]:
+        try:
+            return self._text_cache[text]
+        except KeyError:
+            pass
+        result = set()
+        for raw in self.SPLIT_RE.split(text):
+            cleaned = self.clean_label(raw)
+            if not cleaned:
+                continue
+            category = self._match_fragment(cleaned)
+            if category is not None:
+                result.add(category)
+        normalized = tuple(result)
+        self._text_cache[text] = normalized
+        return normalized
+
+    def normalize(self, category_text) -> List[str]:
+        """카테고리 문자열 하나를 표준 카테고리 리스트로 변환합니다 (결측치는 빈 리스트)."""
+        if pd.isna(category_text):
+            return []
+        return list(self._normalize_text(str(category_text)))
+
+    def normalize_series(self, series: pd.Series) -> pd.Series:
+        """Series 전체를 변환합니다. 고유 문자열마다 한 번만 계산하고 행마다 새 리스트를 만듭니다."""
+        unique = {}
+        for value in series.dropna().unique():
+            unique[value] = self._normalize_text(str(value))
+        return pd.Series(
+            [list(unique[value]) if value in unique else [] for value in series],
+            index=series.index, dtype=object, name=series.name
+        )
+
+
+category_normalizer = CategoryNormalizer(CATEGORY_KEYWORD_MAP)
@@ -0,0 +1,149 @@
+import json
+import os
+import numpy as np
+from typing import List, Tuple
+
+from backend.app.models.forest_arrays import ForestArrays
+
+
+class CompiledChainPredictor:
+    """
+    ClassifierChain(RandomForest) 예측을 평탄화된 트리 배열 위의 NumPy 연산으로 수행하는 예측기.
+
+    링크마다 배치의 모든 샘플 × 모든 트리의 현재 노드를 한 배열로 두고, 깊이만큼 한 번에 한 단계씩 내려갑니다
+    (리프는 자기 자신을 가리키므로 깊이가 다른 트리도 같은 횟수만큼 반복).
+    sklearn과 같이 입력을 float32로 바꿔 노드 임계값과 비교하고, 트리별 리프 확률을 트리 순서대로 더한 뒤
+    트리 수로 나누므로 RandomForestClassifier.predict_proba(n_jobs=None)와 비트 단위로 같은 결과를 냅니다.
+    앞 링크의 예측 라벨은 sklearn ClassifierChain(chain_method='predict')과 같이 다음 링크의 피처로 덧붙입니다.
+    """
+
+    CHILDREN_FILENAME = "compiled_children.npy"
+    FEATURE_FILENAME = "compiled_feature.npy"
+    META_FILENAME = "compiled.json"
+
+    def __init__(self, forest_arrays: ForestArrays, children: np.ndarray, feature: np.ndarray,
+                 order: List[int], link_classes: List[List[int]], link_depths: List[int], n_features: int):
+        # 메모리 매핑 배열도 복사 없이 일반 ndarray 뷰로 다룸 (np.memmap 하위 클래스 생성 비용 제거)
+        self.forest_arrays = forest_arrays
+        self.children = np.asarray(children)  # (전체 노드 수, 2): 전역 노드 번호의 왼쪽/오른쪽 자식 (리프는 자기 자신)
+        self.feature = np.asarray(feature)  # 분기 피처 (리프는 0)
+        self.order = np.asarray(order, dtype=np.intp)
+        self.link_classes = [np.asarray(classes) for classes in link_classes]
+        self.link_depths = link_depths
+        self.n_features = n_features
+
+        self.threshold = np.asarray(forest_arrays.nodes['threshold'])
+        self.values = np.asarray(forest_arrays.values)
+        tree_ends = np.cumsum(forest_arrays.link_tree_counts)
+        self.link_tree_ranges = list(zip(tree_ends - np.asarray(forest_arrays.link_tree_counts), tree_ends))
+        self.inv_order = np.empty_like(self.order)
+        self.inv_order[self.order] = np.arange(len(self.order))
+
+    def arrays(self) -> List[np.ndarray]:
+        """평탄화 배열 (트리 배열과 공유하는 threshold/value 제외)."""
+        return [self.children, self.feature]
+
+    @staticmethod
+    def supports(chain) -> bool:
+        """label을 다음 링크 피처로 쓰는 단일 출력 체인인지 확인합니다 (트리를 뺀 체인도 가능)."""
+        if getattr(chain, 'chain_method_', 'predict') != 'predict':
+            return False
+        return all(getattr(link, 'n_outputs_', None) == 1 for link in getattr(chain, 'estimators_', ()))
+
+    @classmethod
+    def compile(cls, chain, forest_arrays: ForestArrays) -> "CompiledChainPredictor":
+        """체인(트리를 뺀 체인 포함)의 링크 정보와 트리 배열로 예측기를 만듭니다."""
+        if [len(link.estimators_) for link in chain.estimators_] != forest_arrays.link_tree_counts:
+            raise ValueError("트리 배열의 링크별 트리 수가 모델과 일치하지 않습니다")
+        offsets = forest_arrays.tree_offsets
+        node_tree_base = np.repeat(offsets[:-1], np.diff(offsets))
+        node_ids = np.arange(forest_arrays.n_nodes, dtype=np.int64)
+        left = np.asarray(forest_arrays.nodes['left_child'])
+        right = np.asarray(forest_arrays.nodes['right_child'])
+        is_leaf = left < 0
+        children = np.empty((forest_arrays.n_nodes, 2), dtype=np.int64)
+        children[:, 0] = np.where(is_leaf, node_ids, left + node_tree_base)
+        children[:, 1] = np.where(is_leaf, node_ids, right + node_tree_base)
+        feature = np.where(is_leaf, 0, np.asarray(forest_arrays.nodes['feature'])).astype(np.int64)
+
+        link_depths = []
+        start = 0
+        for n_trees in forest_arrays.link_tree_counts:
+            link_depths.append(max(forest_arrays.max_depths[start:start + n_trees], default=0))
+            start += n_trees
+        return cls(
+            forest_arrays, children, feature,
+            [int(i) for i in chain.order_],
+            [link.classes_.tolist() for link in chain.estimators_],
+            link_depths,
+            int(chain.estimators_[0].n_features_in_),
+        )
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """인코딩된 피처 행렬의 (바이너리 라벨, 라벨별 양성 확률)을 원래 라벨 순서로 반환합니다."""
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"피처 수가 모델과 다릅니다: {X.shape}, 기대값 {self.n_features}")
+        n_samples, n_links = X.shape[0], len(self.link_classes)
+        # sklearn 트리 예측과 같이 float32 입력 (앞 링크의 라벨 컬럼을 뒤에 채움)
+        X_chain = np.empty((n_samples, self.n_features + n_links), dtype=np.float32)
+        X_chain[:, :self.n_features] = X
+        if not np.isfinite(X_chain[:, :self.n_features]).all():
+            # sklearn ClassifierChain과 같이 NaN/inf 입력은 거부
+            raise ValueError("입력 피처에 NaN 또는 무한대 값이 있습니다")
+        # 2차원 팬시 인덱싱 대신 평탄화한 배열에 take로 접근
+        X_flat = X_chain.reshape(-1)
+        row_base = (np.arange(n_samples) * X_chain.shape[1])[:, np.newaxis]
+        children_flat = self.children.reshape(-1)
+        values = self.values
+        tree_offsets = self.forest_arrays.tree_offsets
+
+        y_label_chain = np.zeros((n_samples, n_links))
+        y_proba_chain = np.zeros((n_samples, n_links))
+        for chain_idx, (tree_start, tree_end) in enumerate(self.link_tree_ranges):
+            nodes = np.repeat(tree_offsets[np.newaxis, tree_start:tree_end], n_samples, axis=0)
+            for _ in range(self.link_depths[chain_idx]):
+                x = X_flat.take(row_base + self.feature.take(nodes))
+                go_right = ~(x <= self.threshold.take(nodes))
+                nodes = children_flat.take(nodes * 2 + go_right)
+
+            classes = self.link_classes[chain_idx]
+            leaf_proba = values[nodes, 0, :len(classes)]
+            # RandomForestClassifier.predict_proba: 트리 순서대로 누적한 뒤 트리 수로 나눔
+            proba = np.cumsum(leaf_proba, axis=1)[:, -1, :]
+            proba /= tree_end - tree_start
+            y_label_chain[:, chain_idx] = classes.take(np.argmax(proba, axis=1), axis=0)
+            y_proba_chain[:, chain_idx] = proba[:, -1]
+            X_chain[:, self.n_features + chain_idx] = y_label_chain[:, chain_idx]
+
+        return y_label_chain[:, self.inv_order], y_proba_chain[:, self.inv_order]
+
+    def save(self, dirpath: str):
+        """평탄화 배열을 트리 배열과 같은 버전 디렉터리에 저장합니다."""
+        for filename, array in ((self.CHILDREN_FILENAME, self.children), (self.FEATURE_FILENAME, self.feature)):
+            with open(os.path.join(dirpath, filename), "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+        meta = {
+            'order': self.order.tolist(),
+            'link_classes': [classes.tolist() for classes in self.link_classes],
+            'link_depths': self.link_depths,
+            'n_features': self.n_features,
+        }
+        with open(os.path.join(dirpath, self.META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def exists(cls, dirpath: str) -> bool:
+        return os.path.exists(os.path.join(dirpath, cls.META_FILENAME))
+
+    @classmethod
+    def load(cls, dirpath: str, forest_arrays: ForestArrays, mmap_mode='r') -> "CompiledChainPredictor":
+        """저장된 평탄화 배열을 메모리 매핑으로 엽니다."""
+        with open(os.path.join(dirpath, cls.META_FILENAME), encoding="utf-8") as f:
+            meta = json.load(f)
+        children = np.load(os.path.join(dirpath, cls.CHILDREN_FILENAME), mmap_mode=mmap_mode)
+        feature = np.load(os.path.join(dirpath, cls.FEATURE_FILENAME), mmap_mode=mmap_mode)
+        if len(children) != forest_arrays.n_nodes or len(feature) != forest_arrays.n_nodes:
+            raise ValueError("평탄화 배열 크기가 트리 배열과 일치하지 않습니다")
+        return cls(forest_arrays, children, feature, meta['order'], meta['link_classes'],
+                   meta['link_depths'], meta['n_features'])
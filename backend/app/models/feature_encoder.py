@@ -0,0 +1,104 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+class FeatureEncoder:
+    """
+    학습 시 저장된 onehot_columns와 학습된 scaler로부터 한 번만 만들어 재사용하는 입력 인코더.
+    정규화된 입력 dict를 DataFrame을 거치지 않고 바로 NumPy 행으로 변환합니다.
+    (train()의 피처 엔지니어링과 동일한 피처를 생성합니다)
+    """
+
+    MULTILABEL_COLS = ('purpose', 'prefercolor', 'fashionstyle')
+    SINGLE_LABEL_COLS = ('gender', 'mbti')
+
+    def __init__(self, onehot_columns: List[str], scaler):
+        self.columns = list(onehot_columns)
+        self.n_features = len(self.columns)
+
+        # 컬럼명 -> 컬럼 인덱스 배열 (get_dummies 결과에 중복 컬럼명이 있을 수 있어 배열로 저장)
+        column_index = {}
+        for i, col in enumerate(self.columns):
+            column_index.setdefault(col, []).append(i)
+        self.column_index = {col: np.asarray(idx, dtype=np.intp) for col, idx in column_index.items()}
+
+        # 수치형 피처: StandardScaler.transform과 동일한 순서로 (x - mean) / scale 적용
+        self.numeric_features = []
+        feature_names = getattr(scaler, 'feature_names_in_', None)
+        if feature_names is not None:
+            means = scaler.mean_ if scaler.with_mean else None
+            scales = scaler.scale_ if scaler.with_std else None
+            for i, col in enumerate(feature_names):
+                self.numeric_features.append((
+                    col,
+                    None if means is None else means[i],
+                    None if scales is None else scales[i],
+                    self.column_index.get(col),
+                ))
+
+    def encode_into(self, row: np.ndarray, input_dict: Dict):
+        """전처리된 입력 dict를 미리 할당된 1차원 행(row)에 채웁니다."""
+        # 1. 수치형 데이터 변환 및 채우기
+        for col, mean, scale, idx in self.numeric_features:
+            if col not in input_dict:
+                continue
+            value = input_dict[col]
+            value = np.float64(np.nan if value is None else value)
+            if mean is not None:
+                value = value - mean
+            if scale is not None:
+                value = value / scale
+            if idx is not None:
+                row[idx] = value
+
+        # 2. 다중 선택 피처 변환 및 채우기
+        for col in self.MULTILABEL_COLS:
+            if col in input_dict and input_dict[col]:
+                for val in str(input_dict[col]).split(','):
+                    idx = self.column_index.get(f"{col}_{val.strip()}")
+                    if idx is not None:
+                        row[idx] = 1.0
+
+        # 3. 단일 선택 피처 변환 및 채우기
+        for col in self.SINGLE_LABEL_COLS:
+            if col in input_dict and input_dict[col]:
+                idx = self.column_index.get(f"{col}_{input_dict[col]}")
+                if idx is not None:
+                    row[idx] = 1.0
+        return row
+
+    def encode_numeric(self, col: str, value) -> Optional[float]:
+        """수치형 피처 값 하나를 encode_into와 같은 규칙으로 변환합니다 (모델이 쓰지 않는 피처면 None)."""
+        for name, mean, scale, idx in self.numeric_features:
+            if name != col or idx is None:
+                continue
+            value = np.float64(np.nan if value is None else value)
+            if mean is not None:
+                value = value - mean
+            if scale is not None:
+                value = value / scale
+            return float(value)
+        return None
+
+    def active_columns(self, col: str, value) -> frozenset:
+        """범주형 피처 값 하나가 1로 채우는 one-hot 컬럼명 집합을 반환합니다 (encode_into와 같은 규칙)."""
+        if not value:
+            return frozenset()
+        if col in self.MULTILABEL_COLS:
+            names = (f"{col}_{val.strip()}" for val in str(value).split(','))
+        else:
+            names = (f"{col}_{value}",)
+        return frozenset(name for name in names if name in self.column_index)
+
+    def encode(self, input_dict: Dict) -> np.ndarray:
+        """전처리된 입력 dict 하나를 (1, n_features) 행렬로 변환합니다."""
+        X = np.zeros((1, self.n_features), dtype=np.float64)
+        self.encode_into(X[0], input_dict)
+        return X
+
+    def encode_batch(self, input_dicts: List[Dict]) -> np.ndarray:
+        """전처리된 입력 dict 목록을 (N, n_features) 행렬로 변환합니다."""
+        X = np.zeros((len(input_dicts), self.n_features), dtype=np.float64)
+        for i, input_dict in enumerate(input_dicts):
+            self.encode_into(X[i], input_dict)
+        return X
@@ -0,0 +1,210 @@
+import copy
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+from sklearn.base import clone
+from sklearn.tree._tree import NODE_DTYPE, Tree
+
+PAGE_SIZE = 4096
+
+
+def page_in(arrays: Iterable[np.ndarray]) -> int:
+    """
+    배열마다 페이지당 1바이트씩 읽어 메모리 매핑한 파일을 페이지 캐시에 올리고 읽은 배열의 전체 바이트 수를 반환합니다.
+    (첫 요청이 페이지 폴트 비용을 치르지 않도록 워밍업에서 사용)
+    """
+    total = 0
+    for array in arrays:
+        if array is None or array.size == 0:
+            continue
+        flat = np.asarray(array).reshape(-1).view(np.uint8)
+        int(flat[::PAGE_SIZE].sum())
+        total += flat.nbytes
+    return total
+
+
+class ForestArrays:
+    """
+    ClassifierChain의 링크별 RandomForest에 들어 있는 모든 트리의 노드 배열.
+
+    트리 노드는 필드별 배열(left_child, threshold, ...)을 트리 순서대로 이어 붙인 structure-of-arrays로,
+    노드 값(value)은 (전체 노드 수, n_outputs, 최대 클래스 수) 배열로 압축 없는 .npy에 저장합니다.
+    서빙 시에는 메모리 매핑으로 열기 때문에 여러 워커가 같은 페이지 캐시를 공유하고,
+    sklearn 트리 객체는 필요할 때(attach) 이 배열에서 다시 만듭니다.
+    """
+
+    NODE_FIELDS = NODE_DTYPE.names
+    VALUES_FILENAME = "value.npy"
+    OFFSETS_FILENAME = "tree_offsets.npy"
+    META_FILENAME = "meta.json"
+
+    def __init__(self, nodes: Dict[str, np.ndarray], values: np.ndarray, tree_offsets: np.ndarray,
+                 link_tree_counts: List[int], value_widths: List[int], max_depths: List[int]):
+        self.nodes = nodes
+        self.values = values
+        self.tree_offsets = tree_offsets  # 트리 i의 노드 = [tree_offsets[i], tree_offsets[i + 1])
+        self.link_tree_counts = link_tree_counts  # 체인 링크별 트리 수 (체인 순서)
+        self.value_widths = value_widths  # 트리별 value의 클래스 축 크기
+        self.max_depths = max_depths
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.tree_offsets) - 1
+
+    @property
+    def n_nodes(self) -> int:
+        return int(self.tree_offsets[-1])
+
+    def arrays(self) -> List[np.ndarray]:
+        return list(self.nodes.values()) + [self.values, self.tree_offsets]
+
+    @staticmethod
+    def supports(chain) -> bool:
+        """체인의 모든 링크가 트리 앙상블(estimators_[i].tree_)인지 확인합니다."""
+        links = getattr(chain, 'estimators_', None)
+        if not links:
+            return False
+        return all(
+            getattr(link, 'estimators_', None) and all(hasattr(tree, 'tree_') for tree in link.estimators_)
+            for link in links
+        )
+
+    @classmethod
+    def from_chain(cls, chain) -> "ForestArrays":
+        states = []
+        link_tree_counts = []
+        for link in chain.estimators_:
+            link_tree_counts.append(len(link.estimators_))
+            states.extend(tree.tree_.__getstate__() for tree in link.estimators_)
+
+        tree_offsets = np.zeros(len(states) + 1, dtype=np.int64)
+        tree_offsets[1:] = np.cumsum([state['node_count'] for state in states])
+        n_outputs = max(state['values'].shape[1] for state in states)
+        value_widths = [int(state['values'].shape[2]) for state in states]
+        values = np.zeros((int(tree_offsets[-1]), n_outputs, max(value_widths)), dtype=np.float64)
+        nodes = {name: np.empty(int(tree_offsets[-1]), dtype=NODE_DTYPE.fields[name][0]) for name in cls.NODE_FIELDS}
+        for state, start, end in zip(states, tree_offsets[:-1], tree_offsets[1:]):
+            tree_values = state['values']
+            values[start:end, :tree_values.shape[1], :tree_values.shape[2]] = tree_values
+            for name in cls.NODE_FIELDS:
+                nodes[name][start:end] = state['nodes'][name]
+        return cls(nodes, values, tree_offsets, link_tree_counts, value_widths,
+                   [int(state['max_depth']) for state in states])
+
+    @staticmethod
+    def strip_trees(chain):
+        """
+        트리 노드(tree_)를 뺀 체인의 얕은 복사본을 반환합니다 (원본 체인은 바꾸지 않음).
+        체인의 템플릿 estimator는 학습된 모델이 들어 있을 수 있으므로 파라미터만 남깁니다 (clone).
+        """
+        skeleton = copy.copy(chain)
+        if getattr(chain, 'estimator', None) is not None:
+            skeleton.estimator = clone(chain.estimator)
+        skeleton.estimators_ = []
+        for link in chain.estimators_:
+            link_skeleton = copy.copy(link)
+            link_skeleton.estimators_ = []
+            for tree in link.estimators_:
+                tree_skeleton = copy.copy(tree)
+                del tree_skeleton.tree_
+                link_skeleton.estimators_.append(tree_skeleton)
+            skeleton.estimators_.append(link_skeleton)
+        return skeleton
+
+    def build_tree(self, index: int, estimator) -> Tree:
+        """index번째 트리의 sklearn Tree를 만듭니다 (sklearn이 노드 배열을 자체 메모리로 복사)."""
+        start, end = int(self.tree_offsets[index]), int(self.tree_offsets[index + 1])
+        node_array = np.empty(end - start, dtype=NODE_DTYPE)
+        for name in self.NODE_FIELDS:
+            node_array[name] = self.nodes[name][start:end]
+        n_outputs = estimator.n_outputs_
+        value_array = np.ascontiguousarray(self.values[start:end, :n_outputs, :self.value_widths[index]])
+        tree = Tree(estimator.n_features_in_, np.atleast_1d(estimator.n_classes_).astype(np.intp), n_outputs)
+        tree.__setstate__({
+            'max_depth': self.max_depths[index],
+            'node_count': end - start,
+            'nodes': node_array,
+            'values': value_array,
+        })
+        return tree
+
+    def attach(self, skeleton):
+        """strip_trees로 만든 체인에 트리 노드를 채워 예측/학습 가능한 체인을 반환합니다."""
+        if [len(link.estimators_) for link in skeleton.estimators_] != self.link_tree_counts:
+            raise ValueError("트리 배열의 링크별 트리 수가 모델과 일치하지 않습니다")
+        chain = copy.copy(skeleton)
+        chain.estimators_ = []
+        index = 0
+        for link in skeleton.estimators_:
+            link_copy = copy.copy(link)
+            link_copy.estimators_ = []
+            for tree_skeleton in link.estimators_:
+                tree = copy.copy(tree_skeleton)
+                tree.tree_ = self.build_tree(index, tree_skeleton)
+                link_copy.estimators_.append(tree)
+                index += 1
+            chain.estimators_.append(link_copy)
+        return chain
+
+    def save(self, dirpath: str):
+        """
+        배열은 압축 없는 .npy로, 트리별 정보는 meta.json으로 저장합니다.
+        dirpath는 저장마다 새로 만드는 디렉터리여야 합니다 (new_version_dirpath 참고).
+        """
+        os.makedirs(dirpath, exist_ok=True)
+        arrays = {f"{name}.npy": array for name, array in self.nodes.items()}
+        arrays[self.VALUES_FILENAME] = self.values
+        arrays[self.OFFSETS_FILENAME] = self.tree_offsets
+        for filename, array in arrays.items():
+            with open(os.path.join(dirpath, filename), "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+        meta = {
+            'link_tree_counts': self.link_tree_counts,
+            'value_widths': self.value_widths,
+            'max_depths': self.max_depths,
+        }
+        with open(os.path.join(dirpath, self.META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, dirpath: str, mmap_mode: Optional[str] = 'r') -> "ForestArrays":
+        """저장된 트리 배열을 메모리 매핑으로 엽니다."""
+        with open(os.path.join(dirpath, cls.META_FILENAME), encoding="utf-8") as f:
+            meta = json.load(f)
+        nodes = {
+            name: np.load(os.path.join(dirpath, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in cls.NODE_FIELDS
+        }
+        values = np.load(os.path.join(dirpath, cls.VALUES_FILENAME), mmap_mode=mmap_mode)
+        tree_offsets = np.load(os.path.join(dirpath, cls.OFFSETS_FILENAME))
+        arrays = cls(nodes, values, tree_offsets, meta['link_tree_counts'], meta['value_widths'], meta['max_depths'])
+        if any(len(array) != arrays.n_nodes for array in nodes.values()) or len(values) != arrays.n_nodes:
+            raise ValueError("트리 배열 크기가 메타데이터와 일치하지 않습니다")
+        return arrays
+
+    @staticmethod
+    def new_version_dirpath(rootpath: str) -> str:
+        """
+        저장할 새 버전 디렉터리 경로. 다른 워커가 이전 버전을 메모리 매핑 중일 수 있으므로
+        기존 파일을 덮어쓰지 않고 버전마다 새 디렉터리에 씁니다.
+        """
+        return os.path.join(rootpath, uuid.uuid4().hex)
+
+    @staticmethod
+    def remove_old_versions(rootpath: str, keep_latest: int = 2):
+        """
+        최근 keep_latest개를 제외한 이전 버전 디렉터리를 지웁니다.
+        직전 버전은 아직 이전 모델 파일을 읽고 있는 워커를 위해 남기며, 이미 매핑한 프로세스는 지워진 뒤에도 계속 읽을 수 있습니다.
+        """
+        if not os.path.isdir(rootpath):
+            return
+        versions = sorted(
+            (entry for entry in os.scandir(rootpath) if entry.is_dir()),
+            key=lambda entry: entry.stat().st_mtime, reverse=True
+        )
+        for entry in versions[keep_latest:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class PredictionCache:
+    """
+    정규화된 추천 입력을 키로 하는 LRU/TTL 예측 결과 캐시.
+    maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거하고, ttl(초)이 지난 항목은 만료시킵니다.
+    maxsize가 0 이하이면 캐시를 사용하지 않으며, ttl이 0 이하이면 만료 없이 LRU로만 동작합니다.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """캐시된 값을 반환합니다 (없거나 만료되었으면 None)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: object):
+        """값을 저장하고, 용량을 넘으면 가장 오래 사용되지 않은 항목을 제거합니다."""
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl and self.ttl > 0 else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """모든 항목을 제거합니다 (모델이 교체될 때 호출)."""
+        with self._lock:
+            if self._data:
+                self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        """캐시 크기 조정을 위한 카운터를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
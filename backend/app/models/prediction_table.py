@@ -0,0 +1,231 @@
+import json
+import os
+import threading
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.app.models.feature_encoder import FeatureEncoder
+
+
+class PredictionTable:
+    """
+    카테고리 모델의 입력 공간 전체(나이 구간 × gender × mbti × purpose × fashionstyle × prefercolor)에 대한
+    예측 결과(바이너리 라벨, 라벨별 확률) 테이블.
+
+    나이 차원은 포레스트의 모든 트리가 나이 피처를 나누는 임계값 사이 구간 단위로 열거합니다.
+    같은 구간의 나이는 모든 트리에서 같은 리프로 가므로, 요청 나이를 구간으로 바꿔 조회하면 실시간 추론과 비트 단위로 같습니다.
+    범주형 차원은 입력값이 켜는 one-hot 컬럼 집합 단위로 열거하므로, 인코딩 결과가 같은 입력은 같은 행을 공유합니다.
+    배열은 .npy 파일로 저장되어 서빙 시에는 메모리 매핑으로 읽고, 테이블에 없는 입력은 None을 반환해
+    호출 측이 실시간 추론으로 처리하도록 합니다.
+    """
+
+    DIMENSIONS = ('age', 'gender', 'mbti', 'purpose', 'fashionstyle', 'prefercolor')
+    AGE_DIMENSION = DIMENSIONS[0]
+    CATEGORICAL_DIMENSIONS = DIMENSIONS[1:]
+    CHUNK_SIZE = 50000
+
+    LABELS_FILENAME = "labels.npy"
+    PROBA_FILENAME = "proba.npy"
+    META_FILENAME = "meta.json"
+
+    def __init__(self, age_thresholds: Iterable[float], categorical_keys: Dict[str, List[frozenset]],
+                 labels: np.ndarray, proba: np.ndarray, model_stamp: str):
+        # 인코딩된 나이 값의 분기 임계값 (정렬, 중복 제거). 구간 i = (thresholds[i - 1], thresholds[i]]
+        self.age_thresholds = np.asarray(sorted({float(t) for t in age_thresholds}), dtype=np.float64)
+        self.categorical_keys = categorical_keys
+        self.labels = labels
+        self.proba = proba
+        self.model_stamp = model_stamp
+
+        self.key_index = {
+            col: {key: i for i, key in enumerate(categorical_keys[col])}
+            for col in self.CATEGORICAL_DIMENSIONS
+        }
+        self.shape = (len(self.age_thresholds) + 1,) + tuple(
+            len(categorical_keys[col]) for col in self.CATEGORICAL_DIMENSIONS
+        )
+        # 행 번호 = 차원별 인덱스의 mixed-radix 조합 (C order)
+        self.strides = tuple(int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape)))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(np.prod(self.shape))
+
+    @staticmethod
+    def split_thresholds(chain, feature_indices: Iterable[int]) -> List[float]:
+        """체인의 모든 트리에서 feature_indices 피처로 분기하는 노드의 임계값을 모읍니다."""
+        features = np.asarray(list(feature_indices), dtype=np.intp)
+        thresholds = set()
+        for link in chain.estimators_:
+            for estimator in link.estimators_:
+                tree = estimator.tree_
+                split = (tree.children_left >= 0) & np.isin(tree.feature, features)
+                thresholds.update(tree.threshold[split].tolist())
+        return sorted(thresholds)
+
+    def age_representatives(self) -> np.ndarray:
+        """
+        나이 구간마다 그 구간에 속하는 float32 값 하나 (트리는 float32로 바꾼 입력을 임계값과 비교).
+        float32 값이 하나도 없는 구간은 어떤 입력도 조회하지 않으므로 아무 값이나 써도 됩니다.
+        """
+        representatives = []
+        for threshold in self.age_thresholds:
+            value = np.float32(threshold)
+            if float(value) > threshold:
+                value = np.nextafter(value, np.float32(-np.inf))
+            representatives.append(value)
+        last = self.age_thresholds[-1] if len(self.age_thresholds) else 0.0
+        value = np.float32(last)
+        if len(self.age_thresholds) and float(value) <= last:
+            value = np.nextafter(value, np.float32(np.inf))
+        representatives.append(value)
+        return np.asarray(representatives, dtype=np.float32)
+
+    @classmethod
+    def build(cls, encoder: FeatureEncoder, predict_matrix: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+              age_thresholds: Iterable[float], dimension_values: Dict[str, Iterable], model_stamp: str) -> "PredictionTable":
+        """
+        도달 가능한 모든 입력 조합을 청크 단위 행렬로 만들어 predict_matrix로 한 번에 채점합니다.
+        age_thresholds에는 포레스트가 인코딩된 나이 피처를 나누는 임계값(split_thresholds)을,
+        dimension_values에는 범주형 차원별로 정규화 후 나올 수 있는 값들을 넘깁니다.
+        """
+        categorical_keys = {}
+        for col in cls.CATEGORICAL_DIMENSIONS:
+            keys = {frozenset()}  # 어떤 컬럼도 켜지 않는 값 (학습 때 없던 값 등)
+            for value in dimension_values.get(col, ()):
+                keys.add(encoder.active_columns(col, value))
+            categorical_keys[col] = sorted(keys, key=sorted)
+
+        table = cls(age_thresholds, categorical_keys, np.empty((0, 0)), np.empty((0, 0)), model_stamp)
+
+        # 차원별 기여 행렬: 차원마다 서로 다른 컬럼만 채우므로 기여의 합이 encode() 결과와 동일
+        # 나이는 구간 대표값을 인코딩된 나이 컬럼에 바로 넣음
+        representatives = table.age_representatives()
+        age_rows = np.zeros((len(representatives), encoder.n_features), dtype=np.float64)
+        age_columns = encoder.column_index.get(cls.AGE_DIMENSION)
+        if age_columns is not None:
+            age_rows[:, age_columns] = representatives.astype(np.float64)[:, np.newaxis]
+        contributions = [age_rows]
+        for col in cls.CATEGORICAL_DIMENSIONS:
+            rows = np.zeros((len(categorical_keys[col]), encoder.n_features), dtype=np.float64)
+            for i, key in enumerate(categorical_keys[col]):
+                for name in key:
+                    rows[i, encoder.column_index[name]] = 1.0
+            contributions.append(rows)
+
+        shape = tuple(len(c) for c in contributions)
+        n_rows = int(np.prod(shape))
+        labels = None
+        proba = None
+        for start in range(0, n_rows, cls.CHUNK_SIZE):
+            flat = np.arange(start, min(start + cls.CHUNK_SIZE, n_rows))
+            indices = np.unravel_index(flat, shape)
+            X = contributions[0][indices[0]]
+            for contribution, index in zip(contributions[1:], indices[1:]):
+                X = X + contribution[index]
+            chunk_labels, chunk_proba = predict_matrix(X)
+            if labels is None:
+                labels = np.empty((n_rows, chunk_labels.shape[1]), dtype=np.uint8)
+                proba = np.empty((n_rows, chunk_proba.shape[1]), dtype=np.float64)
+            labels[flat] = chunk_labels
+            proba[flat] = chunk_proba
+        return cls(table.age_thresholds, categorical_keys, labels, proba, model_stamp)
+
+    def age_index(self, encoder: FeatureEncoder, age) -> Optional[int]:
+        """요청 나이가 속한 나이 구간 번호 (인코딩할 수 없는 나이면 None)."""
+        try:
+            value = encoder.encode_numeric(self.AGE_DIMENSION, age)
+        except (TypeError, ValueError):
+            return None
+        if value is None:
+            # 모델이 나이 피처를 쓰지 않으면 구간은 하나뿐
+            return 0
+        value = np.float32(value)
+        if not np.isfinite(value):
+            return None
+        return int(np.searchsorted(self.age_thresholds, float(value), side='left'))
+
+    def row_index(self, encoder: FeatureEncoder, input_dict: Dict) -> Optional[int]:
+        """정규화된 입력의 테이블 행 번호를 반환합니다 (테이블 밖의 입력이면 None)."""
+        row = self._row_index(encoder, input_dict)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row
+
+    def _row_index(self, encoder: FeatureEncoder, input_dict: Dict) -> Optional[int]:
+        index = self.age_index(encoder, input_dict.get(self.AGE_DIMENSION))
+        if index is None:
+            return None
+        row = index * self.strides[0]
+        for stride, col in zip(self.strides[1:], self.CATEGORICAL_DIMENSIONS):
+            index = self.key_index[col].get(encoder.active_columns(col, input_dict.get(col)))
+            if index is None:
+                return None
+            row += index * stride
+        return row
+
+    def stats(self) -> Dict:
+        """테이블 크기와 조회 적중률을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'rows': len(self),
+                'age_intervals': self.shape[0],
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def lookup(self, encoder: FeatureEncoder, input_dict: Dict) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """입력 하나의 (바이너리 라벨, 확률)을 (1, n_labels) 배열로 반환합니다 (테이블 밖이면 None)."""
+        row = self.row_index(encoder, input_dict)
+        if row is None:
+            return None
+        return np.asarray(self.labels[row:row + 1]), np.asarray(self.proba[row:row + 1])
+
+    def save(self, dirpath: str):
+        """
+        배열은 압축 없는 .npy로, 차원 정보는 meta.json으로 저장합니다.
+        다른 프로세스가 기존 파일을 메모리 매핑 중일 수 있으므로 임시 파일에 쓴 뒤 교체합니다.
+        """
+        os.makedirs(dirpath, exist_ok=True)
+        for filename, array in ((self.LABELS_FILENAME, self.labels), (self.PROBA_FILENAME, self.proba)):
+            path = os.path.join(dirpath, filename)
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, np.asarray(array))
+            os.replace(path + ".tmp", path)
+        meta = {
+            'model_stamp': self.model_stamp,
+            'age_thresholds': self.age_thresholds.tolist(),
+            'categorical_keys': {
+                col: [sorted(key) for key in self.categorical_keys[col]]
+                for col in self.CATEGORICAL_DIMENSIONS
+            },
+        }
+        meta_path = os.path.join(dirpath, self.META_FILENAME)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    @classmethod
+    def load(cls, dirpath: str, mmap_mode: Optional[str] = 'r') -> "PredictionTable":
+        """저장된 테이블을 메모리 매핑으로 엽니다."""
+        with open(os.path.join(dirpath, cls.META_FILENAME), encoding="utf-8") as f:
+            meta = json.load(f)
+        categorical_keys = {
+            col: [frozenset(key) for key in meta['categorical_keys'][col]]
+            for col in cls.CATEGORICAL_DIMENSIONS
+        }
+        labels = np.load(os.path.join(dirpath, cls.LABELS_FILENAME), mmap_mode=mmap_mode)
+        proba = np.load(os.path.join(dirpath, cls.PROBA_FILENAME), mmap_mode=mmap_mode)
+        if 'age_thresholds' not in meta:
+            raise ValueError("나이 구간 형식이 이전 버전인 예측 테이블입니다")
+        table = cls(meta['age_thresholds'], categorical_keys, labels, proba, meta['model_stamp'])
+        if labels.shape[0] != len(table) or proba.shape[0] != len(table):
+            raise ValueError("예측 테이블 배열 크기가 메타데이터와 일치하지 않습니다")
+        return table
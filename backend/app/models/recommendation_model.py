@@ -5,19 +5,42 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler, MultiLabelBinarizer
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report, multilabel_confusion_matrix, hamming_loss, f1_score, jaccard_score
-from sklearn.multiclass import OneVsRestClassifier
 import joblib
 import os
+import threading
 from typing import List, Dict, Tuple
 from datetime import datetime, timedelta
 import re
 
 from sklearn.multioutput import ClassifierChain
+from sklearn.base import clone
+
+from backend.app.models.category_normalizer import category_normalizer
+from backend.app.models.compiled_forest import CompiledChainPredictor
+from backend.app.models.feature_encoder import FeatureEncoder
+from backend.app.models.forest_arrays import ForestArrays, page_in
+from backend.app.models.prediction_cache import PredictionCache
+from backend.app.models.prediction_table import PredictionTable
+from backend.app.models.training_snapshot import TrainingDataSnapshot
+from backend.app.stage_metrics import stage_metrics
 
 class PerfumeRecommendationModel:
+    # predict_categories / predict_categories_batch가 받는 사용자 특성 필드
+    PROFILE_FIELDS = ('age', 'gender', 'mbti', 'purpose', 'fashionstyle', 'prefercolor')
+
     def __init__(self):
+        # 저장된 모델은 트리를 뺀 체인(_model_skeleton)과 메모리 매핑한 트리 배열(_forest_arrays)로 로드하고,
+        # sklearn 체인(self.model)은 처음 접근할 때 만듭니다 (model 속성 참고)
+        self._model = None
+        self._model_skeleton = None
+        self._forest_arrays = None
+        self._forest_version = None  # 현재 모델 파일이 가리키는 트리 배열 디렉터리 이름
+        self._compiled_predictor = None
+        self._model_lock = threading.Lock()
+        # 평탄화된 트리 배열로 체인 예측 (sklearn predict_proba와 비트 단위로 동일, A/B 비교용 스위치)
+        self.use_compiled_predictor = os.getenv("RECOMMENDATION_COMPILED_PREDICTOR", "false").lower() in ("1", "true", "yes")
+        # 모델 파일 형식: forest_arrays(트리 배열 .npy + 작은 pickle) 또는 pickle(체인 전체)
+        self.artifact_format = os.getenv("MODEL_ARTIFACT_FORMAT", "forest_arrays")
         # 모델은 train() 메서드에서 GridSearchCV를 통해 최적화된 후 최종적으로 ClassifierChain으로 정의됩니다.
         self.model = ClassifierChain(RandomForestClassifier(n_estimators=100, random_state=42))
         self.label_encoders = {}
@@ -26,13 +49,90 @@ class PerfumeRecommendationModel:
         self.is_trained = False
         self.last_retrain_date = None
         self.onehot_columns = None  # One-hot 인코딩 컬럼 순서 저장
+        self._feature_encoder = None  # onehot_columns/scaler로부터 만든 예측용 인코더 (지연 생성)
+        # 정규화된 입력 -> 예측 결과 LRU/TTL 캐시 (모델이 교체되면 비워짐)
+        self.prediction_cache = PredictionCache(
+            maxsize=int(os.getenv("RECOMMENDATION_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("RECOMMENDATION_CACHE_TTL", "3600"))
+        )
+        # 전체 입력 공간 사전 계산 모드: train() 후 모든 조합을 채점해 테이블로 저장
+        self.precompute_predictions = os.getenv("RECOMMENDATION_PRECOMPUTE", "false").lower() in ("1", "true", "yes")
+        self.prediction_table = None
+        # GridSearchCV 병렬 작업 수 (-1: 모든 코어, 백그라운드 재훈련에서는 줄여서 사용)
+        self.train_n_jobs = int(os.getenv("MODEL_TRAIN_N_JOBS", "-1"))
+        # GridSearchCV 결과 재사용: 최적 파라미터와 CV 점수 이력은 모델 파일에 함께 저장
+        self.best_params = None
+        self.cv_history = []
+        self.last_grid_search_date = None
+        self.search_baseline_f1 = None  # 마지막 전체 탐색 직후의 검증 Micro F1
+        self.grid_search_interval_days = int(os.getenv("GRID_SEARCH_INTERVAL_DAYS", "7"))
+        self.grid_search_degradation_threshold = float(os.getenv("GRID_SEARCH_DEGRADATION_THRESHOLD", "0.02"))
+        # 피드백 증분 업데이트: 체인의 각 RandomForest에 새 피드백으로 학습한 트리를 추가하고 오래된 트리는 제거
+        # forest_generations: 트리 묶음별 {'date', 'n_trees', 'base'} (estimators_ 순서와 동일, 첫 묶음은 전체 학습분)
+        self.forest_generations = None
+        # 전체 학습 이후 만든 트리 묶음 수 (제거해도 줄지 않음). 새 묶음의 난수 시드로 써서 이전 묶음과 같은 트리가 나오지 않게 함
+        self.forest_generation_count = 0
+        self.incremental_trees = int(os.getenv("FOREST_INCREMENT_TREES", "20"))
+        self.incremental_max_trees = int(os.getenv("FOREST_MAX_INCREMENTAL_TREES", "100"))
+        self.tree_max_age_days = int(os.getenv("FOREST_TREE_MAX_AGE_DAYS", "30"))
+        self.incremental_replay_ratio = float(os.getenv("FOREST_REPLAY_RATIO", "2.0"))
         
         # 모델 파일 경로 설정 (루트 디렉토리 기준)
         current_dir = os.path.dirname(os.path.abspath(__file__))
         # backend/app/models -> backend/app -> backend -> 루트
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
         self.model_filepath = os.path.join(project_root, "ml_models", "perfume_recommendation_multilabel.pkl")
+        self.table_dirpath = os.path.join(project_root, "ml_models", "perfume_recommendation_table")
+        # 전처리된 엑셀 훈련 데이터 스냅샷 (워크북 내용 해시로 구분)
+        self.training_snapshot = TrainingDataSnapshot(os.path.join(project_root, "ml_models", "training_data_snapshot"))
         
+    @property
+    def model(self):
+        """카테고리 예측 ClassifierChain (트리 배열로 로드된 경우 처음 접근할 때 sklearn 트리를 만듦)."""
+        if self._model is None and self._model_skeleton is not None:
+            with self._model_lock:
+                if self._model is None:
+                    start = datetime.utcnow()
+                    self._model = self._forest_arrays.attach(self._model_skeleton)
+                    self._model_skeleton = None
+                    elapsed = (datetime.utcnow() - start).total_seconds()
+                    print(f"트리 배열에서 모델 구성 완료: 트리 {self._forest_arrays.n_trees}개, {elapsed:.2f}초")
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self._model_skeleton = None
+        self._forest_arrays = None
+        self._compiled_predictor = None
+
+    def _get_compiled_predictor(self):
+        """
+        평탄화 예측기를 반환합니다 (스위치가 꺼져 있거나 지원하지 않는 체인이면 None).
+        모델 파일에 저장된 예측기가 없으면 (이전 형식 모델 등) 현재 체인에서 한 번 만듭니다.
+        """
+        if not self.use_compiled_predictor:
+            return None
+        predictor = self._compiled_predictor
+        if predictor is not None:
+            return predictor
+        with self._model_lock:
+            if self._compiled_predictor is None:
+                # sklearn 트리를 만들지 않도록 아직 구성 전이면 트리를 뺀 체인과 트리 배열을 사용
+                chain = self._model if self._model is not None else self._model_skeleton
+                if chain is None or not CompiledChainPredictor.supports(chain):
+                    return None
+                if self._forest_arrays is None:
+                    if not ForestArrays.supports(chain):
+                        return None
+                    self._forest_arrays = ForestArrays.from_chain(chain)
+                self._compiled_predictor = CompiledChainPredictor.compile(chain, self._forest_arrays)
+            return self._compiled_predictor
+
+    def _forest_rootpath(self) -> str:
+        """트리 배열 버전 디렉터리들이 들어가는 경로 (모델 파일 경로 기준)."""
+        return os.path.splitext(self.model_filepath)[0] + "_forest"
+
     def get_feedback_weight(self, is_liked: bool, days_old: int) -> float:
         """피드백의 가중치를 계산합니다."""
         base_weight = 2.0 if is_liked else 1.0  # 좋아요는 더 높은 가중치
@@ -42,46 +142,53 @@ class PerfumeRecommendationModel:
         
         return base_weight * time_decay
     
-    def prepare_feedback_data(self, db_session) -> pd.DataFrame:
-        """실제 사용자 피드백 데이터를 준비합니다."""
+    def get_feedback_weights(self, is_liked: np.ndarray, days_old: np.ndarray) -> np.ndarray:
+        """get_feedback_weight의 벡터 버전 (피드백 여러 개의 가중치를 한 번에 계산)."""
+        base_weight = np.where(is_liked, 2.0, 1.0)  # 좋아요는 더 높은 가중치
+        time_decay = np.maximum(0.1, 1.0 - (days_old / 365))  # 1년 후 10%까지 감소
+        return base_weight * time_decay
+
+    # 피드백 조회 시 한 번에 가져오는 행 수 (서버 측 커서/fetchmany 단위)
+    FEEDBACK_FETCH_SIZE = 10000
+
+    def prepare_feedback_data(self, db_session, since=None) -> pd.DataFrame:
+        """실제 사용자 피드백 데이터를 준비합니다 (since가 주어지면 그 이후에 생성된 추천만)."""
         from backend.app.database import Recommendation, Perfume
         
-        # 피드백이 있는 추천 기록 조회
-        feedback_records = db_session.query(Recommendation).filter(
-            Recommendation.is_liked.isnot(None)
-        ).all()
-        
-        feedback_data = []
-        
-        for record in feedback_records:
-            # 향수 정보 조회
-            perfume = db_session.query(Perfume).filter(Perfume.id == record.perfume_id).first()
-            if not perfume:
-                continue
-            
-            # 익명 사용자는 기본값 사용
-            age = 30
-            gender = "other"
-            personality = "balanced"
-            season_preference = "spring"
-            
-            # 피드백 가중치 계산
-            days_old = (datetime.utcnow() - record.created_at).days
-            weight = self.get_feedback_weight(record.is_liked, days_old)
-            
-            # 좋아요인 경우만 훈련 데이터에 포함 (싫어요는 다른 카테고리 학습에 활용)
-            if record.is_liked:
-                feedback_data.append({
-                    'age': age,
-                    'gender': gender,
-                    'personality': personality,
-                    'season_preference': season_preference,
-                    'perfume_category': [perfume.category],  # 리스트로 변경
-                    'weight': weight,
-                    'source': 'feedback'
-                })
-        
-        return pd.DataFrame(feedback_data)
+        # 좋아요 피드백이 있는 추천 기록과 향수 카테고리를 한 번의 조인 쿼리로 조회
+        # (싫어요는 훈련 데이터에 포함하지 않으므로 SQL에서 제외, 향수가 없는 기록은 조인에서 제외)
+        query = db_session.query(Recommendation.created_at, Perfume.category).join(
+            Perfume, Perfume.id == Recommendation.perfume_id
+        ).filter(
+            Recommendation.is_liked == True,  # noqa: E712 (SQL 비교식)
+            Recommendation.created_at.isnot(None)
+        )
+        if since is not None:
+            query = query.filter(Recommendation.created_at > since)
+        created_at = []
+        categories = []
+        for record_created_at, category in query.yield_per(self.FEEDBACK_FETCH_SIZE):
+            created_at.append(record_created_at)
+            categories.append(category)
+        if not created_at:
+            return pd.DataFrame()
+
+        # 피드백 가중치 계산 (timedelta.days와 같이 일 단위 내림)
+        now = np.datetime64(datetime.utcnow(), 'us')
+        days_old = (now - np.array(created_at, dtype='datetime64[us]')) // np.timedelta64(1, 'D')
+        weights = self.get_feedback_weights(np.ones(len(created_at), dtype=bool), days_old)
+
+        # 익명 사용자는 기본값 사용
+        n = len(created_at)
+        return pd.DataFrame({
+            'age': np.full(n, 30),
+            'gender': ["other"] * n,
+            'personality': ["balanced"] * n,
+            'season_preference': ["spring"] * n,
+            'perfume_category': [[category] for category in categories],  # 리스트로 변경
+            'weight': weights,
+            'source': ['feedback'] * n
+        })
     
     def prepare_enhanced_training_data(self, db_session=None) -> Tuple[pd.DataFrame, pd.Series, np.ndarray]:
         """향상된 훈련 데이터를 준비합니다 (엑셀 데이터 + 피드백 데이터)."""
@@ -111,8 +218,13 @@ class PerfumeRecommendationModel:
         weights = combined_df['weight'].values
         return X, y, weights
 
+    TRAINING_SNAPSHOT_VERSION = 1
+
     def load_excel_data(self) -> pd.DataFrame:
-        """엑셀 데이터를 로드하고 전처리합니다."""
+        """
+        엑셀 데이터를 로드하고 전처리합니다.
+        전처리 결과는 워크북 내용 해시로 구분되는 Arrow 스냅샷으로 저장해 두고, 워크북이 바뀌지 않았으면 스냅샷을 읽습니다.
+        """
         try:
             current_dir = os.path.dirname(os.path.abspath(__file__))
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
@@ -120,73 +232,194 @@ class PerfumeRecommendationModel:
             if not os.path.exists(excel_filepath):
                 print(f"엑셀 파일을 찾을 수 없습니다: {excel_filepath}")
                 return None
-            df = pd.read_excel(excel_filepath)
-            print(f"엑셀 데이터 로드 완료: {len(df)}행, {len(df.columns)}열")
-            column_mapping = {
-                'user_id': 'user_id',
-                'age_group': 'age_group',
-                'gender': 'gender',
-                'style': 'fashionstyle',
-                'color': 'prefercolor',
-                'purpose': 'purpose',
-                'mbti': 'mbti',
-                'preferred_Note': 'perfume_category',
-                'fashionstyle': 'fashionstyle',
-                'prefercolor': 'prefercolor',
-                'perfume_category': 'perfume_category'
-            }
-            df = df.rename(columns=column_mapping)
-            def age_group_to_int(age_group):
-                if isinstance(age_group, str) and age_group.endswith('s'):
-                    try:
-                        return int(age_group[:-1]) + 5
-                    except:
-                        return None
-                return None
-            df['age'] = df['age_group'].apply(age_group_to_int)
-            df['perfume_category'] = df['perfume_category'].apply(self.simplify_perfume_category_list)
-            required_columns = ['age', 'gender', 'mbti', 'purpose', 'fashionstyle', 'prefercolor', 'perfume_category']
-            df = df[required_columns]
-            df['age'] = pd.to_numeric(df['age'], errors='coerce')
-            # mbti 결측치는 'unknown'으로 채움
-            df['mbti'] = df['mbti'].fillna('unknown')
-            df['mbti'] = df['mbti'].replace('', 'unknown')
-            # mbti를 제외한 나머지 필드는 결측치 제거
-            non_mbti_cols = [col for col in required_columns if col != 'mbti']
-            df = df.dropna(subset=non_mbti_cols)
-            print(f"전처리 완료: {len(df)}행")
+            # 전처리 규칙이 바뀌면 TRAINING_SNAPSHOT_VERSION을 올려 이전 스냅샷을 무효화
+            source_hash = f"{TrainingDataSnapshot.source_hash(excel_filepath)}-v{self.TRAINING_SNAPSHOT_VERSION}"
+            try:
+                df = self.training_snapshot.load(source_hash)
+            except Exception as e:
+                print(f"훈련 데이터 스냅샷 로드 실패: {e}")
+                df = None
+            if df is not None:
+                print(f"훈련 데이터 스냅샷 로드 완료: {len(df)}행")
+                return df
+            df = self._read_excel_data(excel_filepath)
+            try:
+                if self.training_snapshot.save(df, source_hash):
+                    print(f"훈련 데이터 스냅샷 저장: {self.training_snapshot.path_for(source_hash)}")
+            except Exception as e:
+                print(f"훈련 데이터 스냅샷 저장 실패: {e}")
             return df
         except Exception as e:
             print(f"엑셀 데이터 로드 실패: {e}")
             return None
-    def preprocess_input(self, input_dict):
-        gender_map = {'여': 'F', '여성': 'F', '남': 'M', '남성': 'M', 'F': 'F', 'M': 'M', 'female': 'F', 'male': 'M', 'unisex': 'unisex'}
-        purpose_map = {
-            '자기만족': 'self_satisfaction', 'good_impression': 'good_impression', 'special_event': 'special_event',
-            'date_or_social': 'date_or_social', 'formal_occasion': 'formal_occasion'
-        }
-        fashionstyle_map = {
-            '캐주얼': 'casual', 'casual': 'casual', 'minimal': 'minimal', 'simple': 'simple',
-            'street': 'street', 'modern': 'modern', 'chic': 'chic', 'sports': 'sports'
+
+    def _read_excel_data(self, excel_filepath: str) -> pd.DataFrame:
+        """워크북을 직접 읽어 훈련에 쓰는 컬럼으로 전처리합니다."""
+        df = pd.read_excel(excel_filepath)
+        print(f"엑셀 데이터 로드 완료: {len(df)}행, {len(df.columns)}열")
+        column_mapping = {
+            'user_id': 'user_id',
+            'age_group': 'age_group',
+            'gender': 'gender',
+            'style': 'fashionstyle',
+            'color': 'prefercolor',
+            'purpose': 'purpose',
+            'mbti': 'mbti',
+            'preferred_Note': 'perfume_category',
+            'fashionstyle': 'fashionstyle',
+            'prefercolor': 'prefercolor',
+            'perfume_category': 'perfume_category'
         }
-        color_map = {
+        df = df.rename(columns=column_mapping)
+        def age_group_to_int(age_group):
+            if isinstance(age_group, str) and age_group.endswith('s'):
+                try:
+                    return int(age_group[:-1]) + 5
+                except:
+                    return None
+            return None
+        df['age'] = df['age_group'].apply(age_group_to_int)
+        df['perfume_category'] = category_normalizer.normalize_series(df['perfume_category'])
+        required_columns = ['age', 'gender', 'mbti', 'purpose', 'fashionstyle', 'prefercolor', 'perfume_category']
+        df = df[required_columns]
+        df['age'] = pd.to_numeric(df['age'], errors='coerce')
+        # mbti 결측치는 'unknown'으로 채움
+        df['mbti'] = df['mbti'].fillna('unknown')
+        df['mbti'] = df['mbti'].replace('', 'unknown')
+        # mbti를 제외한 나머지 필드는 결측치 제거
+        non_mbti_cols = [col for col in required_columns if col != 'mbti']
+        df = df.dropna(subset=non_mbti_cols)
+        print(f"전처리 완료: {len(df)}행")
+        return df
+    # preprocess_input 정규화 규칙 (예측 테이블이 도달 가능한 입력값을 열거할 때도 사용)
+    GENDER_MAP = {'여': 'F', '여성': 'F', '남': 'M', '남성': 'M', 'F': 'F', 'M': 'M', 'female': 'F', 'male': 'M', 'unisex': 'unisex'}
+    PURPOSE_MAP = {
+        '자기만족': 'self_satisfaction', 'good_impression': 'good_impression', 'special_event': 'special_event',
+        'date_or_social': 'date_or_social', 'formal_occasion': 'formal_occasion'
+    }
+    FASHIONSTYLE_MAP = {
+        '캐주얼': 'casual', 'casual': 'casual', 'minimal': 'minimal', 'simple': 'simple',
+        'street': 'street', 'modern': 'modern', 'chic': 'chic', 'sports': 'sports'
+    }
+    COLOR_MAP = {
         '흰색': 'white', '검정': 'black', '파랑': 'blue', '노랑': 'yellow', '초록': 'green',
         '분홍': 'pink', '보라': 'purple', '빨강': 'red', '주황': 'orange', '민트': 'mint',
         '베이지': 'beige', '갈색': 'brown', '그레이': 'gray', '코랄': 'coral'
     }
+    DEFAULT_GENDER = 'F'
+    DEFAULT_PURPOSE = 'good_impression'
+    DEFAULT_FASHIONSTYLE = 'casual'
+    UNKNOWN_COLOR = 'unknown'
+
+    def preprocess_input(self, input_dict):
+        color_map = self.COLOR_MAP
+
         def normalize_color(val):
             if not isinstance(val, str):
-                return 'unknown'
+                return self.UNKNOWN_COLOR
             colors = [color_map.get(c.strip(), c.strip().lower()) for c in val.split(',')]
             return ','.join(colors)
             
         norm = dict(input_dict)
-        norm['gender'] = gender_map.get(str(norm.get('gender', '')).strip(), 'F')
-        norm['purpose'] = purpose_map.get(str(norm.get('purpose', '')).strip(), 'good_impression')
-        norm['fashionstyle'] = fashionstyle_map.get(str(norm.get('fashionstyle', '')).strip(), 'casual')
-        norm['prefercolor'] = normalize_color(norm.get('prefercolor', 'unknown'))
+        norm['gender'] = self.GENDER_MAP.get(str(norm.get('gender', '')).strip(), self.DEFAULT_GENDER)
+        norm['purpose'] = self.PURPOSE_MAP.get(str(norm.get('purpose', '')).strip(), self.DEFAULT_PURPOSE)
+        norm['fashionstyle'] = self.FASHIONSTYLE_MAP.get(str(norm.get('fashionstyle', '')).strip(), self.DEFAULT_FASHIONSTYLE)
+        norm['prefercolor'] = normalize_color(norm.get('prefercolor', self.UNKNOWN_COLOR))
         return norm
     
+    def _get_feature_encoder(self) -> FeatureEncoder:
+        """예측용 피처 인코더를 반환합니다 (모델이 바뀐 뒤 처음 호출될 때 한 번만 생성)."""
+        encoder = self._feature_encoder
+        if encoder is None:
+            encoder = FeatureEncoder(self.onehot_columns, self.scaler)
+            self._feature_encoder = encoder
+        return encoder
+
+    def _reset_prediction_state(self):
+        """모델이 교체되었을 때 이전 모델에서 파생된 인코더와 예측 캐시를 무효화합니다."""
+        self._feature_encoder = None
+        self.prediction_table = None
+        self.prediction_cache.clear()
+
+    def _model_stamp(self) -> str:
+        """사전 계산 테이블이 어떤 모델로 만들어졌는지 구분하기 위한 값."""
+        return self.last_retrain_date.isoformat() if self.last_retrain_date else ""
+
+    def build_prediction_table(self, save: bool = True) -> PredictionTable:
+        """
+        도달 가능한 모든 (나이 구간, gender, mbti, purpose, fashionstyle, prefercolor) 조합을
+        한 번에 채점해 예측 테이블을 만듭니다. 나이 구간은 포레스트가 나이 피처를 나누는 임계값 사이 구간입니다.
+        색상은 단일 색상 값만 열거하며, 그 밖의 입력은 실시간 추론으로 처리됩니다.
+        """
+        if not self.is_trained:
+            raise ValueError("모델이 훈련되지 않았습니다. 먼저 train()을 호출하세요.")
+        encoder = self._get_feature_encoder()
+        age_columns = encoder.column_index.get(PredictionTable.AGE_DIMENSION)
+        age_thresholds = [] if age_columns is None else PredictionTable.split_thresholds(self.model, age_columns)
+        mbti_values = [col[len('mbti_'):] for col in self.onehot_columns if col.startswith('mbti_')]
+        dimension_values = {
+            'gender': set(self.GENDER_MAP.values()) | {self.DEFAULT_GENDER},
+            'mbti': mbti_values,
+            'purpose': set(self.PURPOSE_MAP.values()) | {self.DEFAULT_PURPOSE},
+            'fashionstyle': set(self.FASHIONSTYLE_MAP.values()) | {self.DEFAULT_FASHIONSTYLE},
+            'prefercolor': set(self.COLOR_MAP.values()) | {self.UNKNOWN_COLOR},
+        }
+        start = datetime.utcnow()
+        table = PredictionTable.build(
+            encoder, self._predict_matrix,
+            age_thresholds, dimension_values, self._model_stamp()
+        )
+        elapsed = (datetime.utcnow() - start).total_seconds()
+        print(f"예측 테이블 생성 완료: {len(table)}개 조합, {elapsed:.1f}초")
+        if save:
+            table.save(self.table_dirpath)
+            print(f"Prediction table saved to {self.table_dirpath}")
+        self.prediction_table = table
+        return table
+
+    def _load_prediction_table(self):
+        """현재 모델로 만든 사전 계산 테이블이 있으면 메모리 매핑으로 엽니다."""
+        if not os.path.exists(os.path.join(self.table_dirpath, PredictionTable.META_FILENAME)):
+            return
+        try:
+            table = PredictionTable.load(self.table_dirpath)
+        except Exception as e:
+            print(f"예측 테이블 로드 실패: {e}")
+            return
+        if table.model_stamp != self._model_stamp():
+            print("예측 테이블이 현재 모델과 맞지 않아 사용하지 않습니다.")
+            return
+        self.prediction_table = table
+        print(f"예측 테이블 로드 완료: {len(table)}개 조합")
+
+    def page_in_artifacts(self) -> int:
+        """
+        메모리 매핑한 트리 배열, 평탄화 예측기 배열, 사전 계산 테이블을 한 번씩 읽어 페이지 캐시에 올립니다.
+        읽은 배열의 전체 바이트 수를 반환합니다.
+        """
+        arrays = []
+        if self._forest_arrays is not None:
+            arrays.extend(self._forest_arrays.arrays())
+        if self._compiled_predictor is not None:
+            arrays.extend(self._compiled_predictor.arrays())
+        if self.prediction_table is not None:
+            arrays.extend([self.prediction_table.labels, self.prediction_table.proba])
+        return page_in(arrays)
+
+    def prediction_table_stats(self) -> Dict:
+        """사전 계산 테이블의 크기와 조회 적중률 (테이블이 없으면 loaded=False)."""
+        table = self.prediction_table
+        if table is None:
+            return {'loaded': False}
+        return {'loaded': True, **table.stats()}
+
+    def _lookup_prediction_table(self, input_dict: Dict):
+        """정규화된 입력의 사전 계산 결과를 반환합니다 (테이블이 없거나 테이블 밖이면 None)."""
+        table = self.prediction_table
+        if table is None:
+            return None
+        return table.lookup(self._get_feature_encoder(), input_dict)
+
     def _calculate_match_score(self, perfume: Dict, age: int, gender: str, 
                               personality: str, season: str) -> float:
         """향수와 사용자 선호도의 매칭 점수를 계산합니다."""
@@ -218,12 +451,24 @@ class PerfumeRecommendationModel:
         
         return min(score, 1.0)
     
-    def train(self, db_session=None, force_retrain=False):
-        """모델을 훈련합니다."""
+    def train(self, db_session=None, force_retrain=False, progress_callback=None, search="full"):
+        """
+        모델을 훈련합니다.
+        progress_callback(stage, progress)이 주어지면 단계 이름과 0~1 진행률을 알립니다 (백그라운드 재훈련 작업용).
+        search="full"이면 항상 GridSearchCV를 수행하고, "auto"이면 저장된 최적 파라미터로 최종 ClassifierChain만 학습합니다
+        (탐색 주기가 지났거나 검증 성능이 떨어지면 전체 탐색).
+        """
+        def report(stage, progress):
+            if progress_callback is not None:
+                progress_callback(stage, progress)
+
         # 재훈련 필요성 확인
         if not force_retrain and self.should_retrain():
             print("재훈련이 필요하지 않습니다.")
             return
+        # sklearn 설정은 스레드별로 적용되므로 백그라운드 스레드에서 훈련할 때도 metadata routing을 켬
+        sklearn.set_config(enable_metadata_routing=True)
+        report("loading_data", 0.0)
         X, y, weights = self.prepare_enhanced_training_data(db_session)
         print("[DEBUG] X shape:", X.shape)
         print("[DEBUG] X columns:", X.columns.tolist())
@@ -270,34 +515,83 @@ class PerfumeRecommendationModel:
         X_train, X_test = X_processed.astype(float).iloc[train_indices], X_processed.astype(float).iloc[test_indices]
         y_train, y_test = y_bin[train_indices], y_bin[test_indices]
         w_train, w_test = weights[train_indices], weights[test_indices]
-        # RandomForest 파라미터 튜닝 (GridSearchCV)
-        from sklearn.ensemble import RandomForestClassifier
+        # RandomForest 파라미터 튜닝: 저장된 최적 파라미터를 재사용할 수 있으면 GridSearchCV를 건너뜀
+        run_search = search == "full" or not self._can_reuse_search()
+        cv_score = None
+        if run_search:
+            report("grid_search", 0.1)
+            best_params, cv_score = self._grid_search(X_train, y_train, w_train)
+        else:
+            best_params = self.best_params
+            report("reusing_params", 0.1)
+            print(f"저장된 최적 파라미터로 GridSearchCV 없이 훈련합니다: {best_params}")
+        # 기존: self.model = OneVsRestClassifier(best_rf)
+        # 변경: ClassifierChain 적용
+        report("fitting", 0.7)
+        micro_f1 = self._fit_and_evaluate(best_params, X_train, y_train, w_train, X_test, y_test, report)
+        if not run_search and self._search_degraded(micro_f1):
+            # 재사용한 파라미터로 검증 성능이 기준보다 떨어지면 전체 탐색을 다시 수행
+            print(f"검증 Micro F1 {micro_f1:.3f}이 기준 {self.search_baseline_f1:.3f}보다 낮아 GridSearchCV를 다시 수행합니다.")
+            run_search = True
+            report("grid_search", 0.1)
+            best_params, cv_score = self._grid_search(X_train, y_train, w_train)
+            report("fitting", 0.7)
+            micro_f1 = self._fit_and_evaluate(best_params, X_train, y_train, w_train, X_test, y_test, report)
+        if run_search:
+            self.search_baseline_f1 = micro_f1
+        self._record_search_history("full" if run_search else "reuse", cv_score, micro_f1)
+        self.is_trained = True
+        self.last_retrain_date = datetime.utcnow()
+        report("saving", 0.9)
+        self.save_model()
+        if self.precompute_predictions:
+            report("precomputing", 0.95)
+            try:
+                self.build_prediction_table()
+            except Exception as e:
+                print(f"예측 테이블 생성 실패 (실시간 추론으로 동작): {e}")
+    
+    # GridSearchCV 탐색 공간
+    PARAM_GRID = {
+        'n_estimators': [100, 200],
+        'max_depth': [8, 10, 12],
+        'min_samples_split': [2, 5],
+        'min_samples_leaf': [1, 2],
+        'class_weight': ['balanced']
+    }
+    CV_HISTORY_LIMIT = 50
+
+    def _build_forest(self, params: Dict) -> RandomForestClassifier:
+        rf = RandomForestClassifier(random_state=42, **params)
+        rf.set_fit_request(sample_weight=True)  # sample_weight metadata routing 명시
+        return rf
+
+    def _grid_search(self, X_train, y_train, w_train) -> Tuple[Dict, float]:
+        """GridSearchCV로 RandomForest 파라미터를 탐색하고 (최적 파라미터, 최고 CV 점수)를 반환합니다."""
         from sklearn.model_selection import GridSearchCV
-        param_grid = {
-            'n_estimators': [100, 200],
-            'max_depth': [8, 10, 12],
-            'min_samples_split': [2, 5],
-            'min_samples_leaf': [1, 2],
-            'class_weight': ['balanced']
-        }
-        base_rf = RandomForestClassifier(random_state=42)
-        base_rf.set_fit_request(sample_weight=True)  # sample_weight metadata routing 명시
-        grid_search = GridSearchCV(base_rf, param_grid, cv=3, scoring='f1_micro', n_jobs=-1)
+        base_rf = self._build_forest({})
+        grid_search = GridSearchCV(base_rf, self.PARAM_GRID, cv=3, scoring='f1_micro', n_jobs=self.train_n_jobs)
         try:
             grid_search.fit(X_train, y_train, sample_weight=w_train)
         except Exception as e:
             print(f"GridSearchCV에서 sample_weight 적용 실패: {e}, 가중치 없이 튜닝")
             grid_search.fit(X_train, y_train)
-        best_rf = grid_search.best_estimator_
-        best_rf.set_fit_request(sample_weight=True)  # 최적 모델에도 metadata routing 명시
         print(f"[DEBUG] GridSearch 최적 파라미터: {grid_search.best_params_}")
-        # 기존: self.model = OneVsRestClassifier(best_rf)
-        # 변경: ClassifierChain 적용
-        self.model = ClassifierChain(best_rf)
+        self.best_params = dict(grid_search.best_params_)
+        self.last_grid_search_date = datetime.utcnow()
+        return self.best_params, float(grid_search.best_score_)
+
+    def _fit_and_evaluate(self, params: Dict, X_train, y_train, w_train, X_test, y_test, report) -> float:
+        """주어진 파라미터로 ClassifierChain을 학습하고 검증 지표를 출력한 뒤 Micro F1을 반환합니다."""
+        from sklearn.metrics import accuracy_score, classification_report, multilabel_confusion_matrix, hamming_loss, f1_score, jaccard_score
+        self.model = ClassifierChain(self._build_forest(params))
         self.model.fit(X_train, y_train, sample_weight=w_train)
+        self.forest_generations = [{'date': datetime.utcnow(), 'n_trees': params.get('n_estimators', 100), 'base': True}]
+        self.forest_generation_count = 1
+        self._reset_prediction_state()
         # 모델 평가 - 멀티라벨 분류에 적합한 지표들
+        report("evaluating", 0.85)
         y_pred = self.model.predict(X_test)
-        from sklearn.metrics import accuracy_score, hamming_loss, f1_score, jaccard_score, classification_report, multilabel_confusion_matrix
         exact_accuracy = accuracy_score(y_test, y_pred)
         print(f"Exact Match Accuracy: {exact_accuracy:.3f}")
         hamming_loss_score = hamming_loss(y_test, y_pred)
@@ -312,10 +606,46 @@ class PerfumeRecommendationModel:
         print(classification_report(y_test, y_pred, target_names=self.mlb.classes_, zero_division=0))
         print("\nMultilabel Confusion Matrix:")
         print(multilabel_confusion_matrix(y_test, y_pred))
-        self.is_trained = True
-        self.last_retrain_date = datetime.utcnow()
-        self.save_model()
-    
+        return float(micro_f1)
+
+    def _can_reuse_search(self) -> bool:
+        """저장된 최적 파라미터가 있고 마지막 전체 탐색 후 GRID_SEARCH_INTERVAL_DAYS가 지나지 않았는지 확인합니다."""
+        if not self.best_params or not self.last_grid_search_date:
+            return False
+        days_since_search = (datetime.utcnow() - self.last_grid_search_date).days
+        return days_since_search < self.grid_search_interval_days
+
+    def _search_degraded(self, micro_f1: float) -> bool:
+        """재사용한 파라미터의 검증 Micro F1이 마지막 전체 탐색 기준보다 임계값 넘게 떨어졌는지 확인합니다."""
+        if self.search_baseline_f1 is None:
+            return False
+        return micro_f1 < self.search_baseline_f1 - self.grid_search_degradation_threshold
+
+    def _record_search_history(self, mode: str, cv_score, micro_f1: float):
+        self.cv_history.append({
+            'date': datetime.utcnow(),
+            'mode': mode,  # full: GridSearchCV 수행, reuse: 저장된 파라미터 재사용
+            'best_params': dict(self.best_params) if self.best_params else None,
+            'cv_score': cv_score,
+            'val_micro_f1': micro_f1,
+        })
+        del self.cv_history[:-self.CV_HISTORY_LIMIT]
+
+    def get_search_state(self) -> Dict:
+        """GridSearchCV 결과(최적 파라미터, 점수 이력)를 반환합니다 (새 모델 인스턴스로 넘길 때 사용)."""
+        return {
+            'best_params': self.best_params,
+            'cv_history': list(self.cv_history),
+            'last_grid_search_date': self.last_grid_search_date,
+            'search_baseline_f1': self.search_baseline_f1,
+        }
+
+    def set_search_state(self, state: Dict):
+        self.best_params = state.get('best_params')
+        self.cv_history = list(state.get('cv_history') or [])
+        self.last_grid_search_date = state.get('last_grid_search_date')
+        self.search_baseline_f1 = state.get('search_baseline_f1')
+
     def should_retrain(self) -> bool:
         """재훈련이 필요한지 확인합니다."""
         if not self.is_trained:
@@ -328,12 +658,134 @@ class PerfumeRecommendationModel:
         days_since_last_train = (datetime.utcnow() - self.last_retrain_date).days
         return days_since_last_train >= 7
     
-    def retrain_with_feedback(self, db_session):
+    def retrain_with_feedback(self, db_session, progress_callback=None):
         """피드백 데이터를 사용하여 모델을 재훈련합니다."""
         print("피드백 데이터로 모델을 재훈련합니다...")
-        self.train(db_session, force_retrain=True)
+        self.train(db_session, force_retrain=True, progress_callback=progress_callback, search="auto")
         print("피드백 기반 재훈련 완료!")
     
+    def update_with_feedback(self, db_session, progress_callback=None) -> bool:
+        """
+        마지막 재훈련 이후 쌓인 피드백만으로 모델을 증분 업데이트합니다.
+        체인의 링크마다 기존 RandomForest와 같은 파라미터로 새 트리(incremental_trees개)를 학습해 estimators_에 덧붙이고,
+        tree_max_age_days보다 오래되었거나 incremental_max_trees를 넘는 증분 트리 묶음은 오래된 순으로 제거합니다.
+        새 피드백이 없으면 False를 반환합니다.
+        """
+        def report(stage, progress):
+            if progress_callback is not None:
+                progress_callback(stage, progress)
+
+        if not self.is_trained:
+            raise ValueError("모델이 훈련되지 않았습니다. 먼저 train()을 호출하세요.")
+        chain = self.model
+        if getattr(chain, 'chain_method_', 'predict') != 'predict':
+            raise ValueError("증분 업데이트는 chain_method='predict'인 ClassifierChain에서만 지원합니다.")
+        report("loading_data", 0.0)
+        feedback_df = self.prepare_feedback_data(db_session, since=self.last_retrain_date)
+        if feedback_df.empty:
+            print("새 피드백이 없어 증분 업데이트를 건너뜁니다.")
+            return False
+        print(f"새 피드백 {len(feedback_df)}개로 증분 업데이트를 시작합니다...")
+        sklearn.set_config(enable_metadata_routing=True)
+
+        # 새 피드백 + 기존 학습 데이터 일부(replay): 새 트리도 모든 라벨의 양/음성 클래스를 보도록 함
+        encoder = self._get_feature_encoder()
+        feedback_rows = feedback_df.to_dict('records')
+        X_new = encoder.encode_batch(feedback_rows)
+        y_new = self.mlb.transform(feedback_df['perfume_category'])
+        w_new = feedback_df['weight'].to_numpy(dtype=np.float64)
+        generation_id = self._next_forest_generation()
+        excel_df = self.load_excel_data()
+        if excel_df is not None and not excel_df.empty:
+            rng = np.random.default_rng(generation_id)
+            n_replay = min(len(excel_df), int(np.ceil(len(feedback_df) * self.incremental_replay_ratio)))
+            replay_df = excel_df.iloc[rng.choice(len(excel_df), size=n_replay, replace=False)]
+            X_new = np.vstack((X_new, encoder.encode_batch(replay_df.to_dict('records'))))
+            y_new = np.vstack((y_new, self.mlb.transform(replay_df['perfume_category'])))
+            w_new = np.concatenate((w_new, np.ones(n_replay)))
+
+        # 링크별 트리 추가 (학습 시 ClassifierChain과 같이 이전 링크의 실제 라벨을 피처로 덧붙임)
+        report("fitting", 0.2)
+        generations = self._get_forest_generations()
+        y_ordered = y_new[:, chain.order_]
+        n_links = len(chain.estimators_)
+        new_trees = []
+        for chain_idx, estimator in enumerate(chain.estimators_):
+            X_aug = np.hstack((X_new, y_ordered[:, :chain_idx]))
+            grown = clone(estimator).set_params(
+                n_estimators=self.incremental_trees, warm_start=False,
+                random_state=(estimator.random_state or 0) + generation_id
+            )
+            grown.fit(X_aug, y_ordered[:, chain_idx], sample_weight=w_new)
+            if not np.array_equal(grown.classes_, estimator.classes_):
+                raise ValueError(f"{chain_idx}번째 링크의 새 트리 클래스가 기존 모델과 다릅니다: {grown.classes_}")
+            new_trees.append(grown.estimators_)
+            report("fitting", 0.2 + 0.6 * (chain_idx + 1) / n_links)
+
+        # 모든 링크의 학습이 끝난 뒤 한 번에 반영 (중간에 실패하면 기존 모델 유지)
+        now = datetime.utcnow()
+        for estimator, trees in zip(chain.estimators_, new_trees):
+            estimator.estimators_ = list(estimator.estimators_) + list(trees)
+            estimator.n_estimators = len(estimator.estimators_)
+        generations.append({'date': now, 'n_trees': self.incremental_trees, 'base': False})
+        self.forest_generations = generations
+        self.forest_generation_count = generation_id + 1
+        self._prune_forest_generations(now)
+        self._forest_arrays = None  # 트리가 바뀌었으므로 저장할 때 다시 만듦
+        self._compiled_predictor = None
+        print(f"증분 업데이트 완료: 링크당 트리 {chain.estimators_[0].n_estimators}개 "
+              f"(트리 묶음 {len(self.forest_generations)}개)")
+
+        self.last_retrain_date = now
+        self._reset_prediction_state()
+        report("saving", 0.9)
+        self.save_model()
+        if self.precompute_predictions:
+            report("precomputing", 0.95)
+            try:
+                self.build_prediction_table()
+            except Exception as e:
+                print(f"예측 테이블 생성 실패 (실시간 추론으로 동작): {e}")
+        return True
+
+    def _next_forest_generation(self) -> int:
+        """새로 만들 트리 묶음의 번호 (카운터가 없는 이전 모델 파일은 남아 있는 묶음 수에서 시작)."""
+        return max(self.forest_generation_count, len(self.forest_generations or ()) or 1)
+
+    def _get_forest_generations(self) -> List[Dict]:
+        """트리 묶음 정보를 반환합니다 (정보가 없는 이전 모델 파일은 전체를 전체 학습분 한 묶음으로 간주)."""
+        if self.forest_generations:
+            return list(self.forest_generations)
+        n_trees = len(self.model.estimators_[0].estimators_)
+        return [{'date': self.last_retrain_date or datetime.utcnow(), 'n_trees': n_trees, 'base': True}]
+
+    def _prune_forest_generations(self, now: datetime):
+        """
+        tree_max_age_days보다 오래된 증분 트리 묶음과, 증분 트리 수가 incremental_max_trees를 넘는 만큼의
+        오래된 묶음을 체인의 모든 링크에서 제거합니다. 전체 학습분(base)은 다음 전체 재훈련 때 교체됩니다.
+        """
+        max_age = timedelta(days=self.tree_max_age_days)
+        incremental = sum(g['n_trees'] for g in self.forest_generations if not g['base'])
+        keep = []
+        for generation in self.forest_generations:
+            stale = now - generation['date'] > max_age or incremental > self.incremental_max_trees
+            if not generation['base'] and stale:
+                incremental -= generation['n_trees']
+                keep.append(False)
+            else:
+                keep.append(True)
+        if all(keep):
+            return
+        for estimator in self.model.estimators_:
+            trees, offset = [], 0
+            for generation, kept in zip(self.forest_generations, keep):
+                if kept:
+                    trees.extend(estimator.estimators_[offset:offset + generation['n_trees']])
+                offset += generation['n_trees']
+            estimator.estimators_ = trees
+            estimator.n_estimators = len(trees)
+        self.forest_generations = [g for g, kept in zip(self.forest_generations, keep) if kept]
+
     def predict_categories(self, age: int, gender: str, mbti: str, purpose: str, fashionstyle: str, prefercolor: str) -> tuple:
         """사용자 특성에 따른 향수 카테고리들을 예측합니다."""
         if not self.is_trained:
@@ -347,50 +799,141 @@ class PerfumeRecommendationModel:
             'fashionstyle': fashionstyle,
             'prefercolor': prefercolor
         }
-        print(f"[DEBUG] raw input_dict: {input_dict}")
-        input_dict = self.preprocess_input(input_dict)
-        print(f"[DEBUG] preprocessed input_dict: {input_dict}")
-        
-        # --- 훈련 시점과 동일한 구조의 입력 데이터 생성 ---
-        # 1. 훈련된 컬럼 목록을 기반으로 빈 데이터프레임 생성
-        input_processed = pd.DataFrame(columns=self.onehot_columns)
-        input_processed.loc[0] = 0.0
+        with stage_metrics.timer("preprocess_input"):
+            input_dict = self.preprocess_input(input_dict)
 
-        # 2. 수치형 데이터 변환 및 채우기
-        numeric_features = [col for col in self.scaler.feature_names_in_ if col in input_dict]
-        if numeric_features:
-            numeric_df = pd.DataFrame([input_dict])[numeric_features]
-            scaled_numeric = self.scaler.transform(numeric_df)
-            for i, col in enumerate(numeric_features):
-                input_processed.loc[0, col] = scaled_numeric[0, i]
+        # 정규화된 입력이 같으면 예측 결과도 같으므로 캐시를 먼저 확인
+        cache_key = tuple(input_dict.get(field) for field in self.PROFILE_FIELDS)
+        cached = self.prediction_cache.get(cache_key)
+        if cached is not None:
+            predicted_categories, confidences = cached
+            return predicted_categories, dict(confidences)
 
-        # 3. 다중 선택 피처 변환 및 채우기
-        multilabel_cols = ['purpose', 'prefercolor', 'fashionstyle']
-        for col in multilabel_cols:
-            if col in input_dict and input_dict[col]:
-                values = str(input_dict[col]).split(',')
-                for val in values:
-                    dummy_col_name = f"{col}_{val.strip()}"
-                    if dummy_col_name in input_processed.columns:
-                        input_processed.loc[0, dummy_col_name] = 1
-
-        # 4. 단일 선택 피처 변환 및 채우기
-        single_label_cols = ['gender', 'mbti']
-        for col in single_label_cols:
-            if col in input_dict and input_dict[col]:
-                dummy_col_name = f"{col}_{input_dict[col]}"
-                if dummy_col_name in input_processed.columns:
-                    input_processed.loc[0, dummy_col_name] = 1
-
-        # 예측
-        y_pred_bin = self.model.predict(input_processed)
+        # 사전 계산 테이블에 있으면 sklearn 호출 없이 조회, 없으면 실시간 추론
+        table_result = self._lookup_prediction_table(input_dict)
+        if table_result is not None:
+            y_pred_bin, y_pred_proba = table_result
+        else:
+            # --- 훈련 시점과 동일한 구조의 입력 데이터 생성 ---
+            # 미리 컴파일된 인코더로 정규화된 입력을 바로 피처 행으로 변환
+            with stage_metrics.timer("encode_features"):
+                input_processed = self._get_feature_encoder().encode(input_dict)
+
+            # 예측
+            with stage_metrics.timer("predict"):
+                y_pred_bin, y_pred_proba = self._predict_matrix(input_processed)
         # 바이너리 결과를 라벨 리스트로 변환
         predicted_categories = self.mlb.inverse_transform(y_pred_bin)[0]
         # 모든 카테고리에 대해 confidence 반환
-        y_pred_proba = self.model.predict_proba(input_processed)
         confidences = {self.mlb.classes_[i]: y_pred_proba[0][i] for i in range(len(self.mlb.classes_))}
+        self.prediction_cache.put(cache_key, (predicted_categories, dict(confidences)))
         return predicted_categories, confidences
-    
+
+    def predict_categories_batch(self, profiles: List[Dict], use_cache: bool = False) -> List[tuple]:
+        """
+        여러 사용자 프로필의 향수 카테고리를 한 번에 예측합니다.
+        N개의 프로필을 하나의 행렬로 인코딩해 체인 추론을 한 번만 수행하며,
+        각 프로필마다 predict_categories와 동일한 (predicted_categories, confidences)를 반환합니다.
+        use_cache=True이면 predict_categories와 같은 예측 캐시를 조회/갱신합니다 (단건 요청을 묶어 처리할 때 사용).
+        """
+        if not self.is_trained:
+            raise ValueError("모델이 훈련되지 않았습니다. 먼저 train()을 호출하세요.")
+        if not profiles:
+            return []
+        with stage_metrics.timer("preprocess_input"):
+            input_dicts = [
+                self.preprocess_input({field: profile.get(field) for field in self.PROFILE_FIELDS})
+                for profile in profiles
+            ]
+        results = [None] * len(input_dicts)
+        cache_keys = None
+        if use_cache:
+            cache_keys = [tuple(input_dict.get(field) for field in self.PROFILE_FIELDS) for input_dict in input_dicts]
+            for row, cache_key in enumerate(cache_keys):
+                cached = self.prediction_cache.get(cache_key)
+                if cached is not None:
+                    results[row] = (cached[0], dict(cached[1]))
+
+        missing_rows = [row for row, result in enumerate(results) if result is None]
+        if missing_rows:
+            y_pred_bin, y_pred_proba = self._predict_rows([input_dicts[row] for row in missing_rows])
+            predicted_categories = self.mlb.inverse_transform(y_pred_bin)
+            classes = self.mlb.classes_
+            for i, row in enumerate(missing_rows):
+                confidences = {classes[j]: y_pred_proba[i][j] for j in range(len(classes))}
+                results[row] = (predicted_categories[i], confidences)
+                if use_cache:
+                    self.prediction_cache.put(cache_keys[row], (predicted_categories[i], dict(confidences)))
+        return results
+
+    def _predict_rows(self, input_dicts: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """정규화된 입력 목록의 (바이너리 라벨, 확률)을 사전 계산 테이블 조회와 행렬 추론으로 채웁니다."""
+        encoder = self._get_feature_encoder()
+
+        # 사전 계산 테이블에 있는 프로필은 조회로 채우고, 나머지만 하나의 행렬로 추론
+        table = self.prediction_table
+        table_rows = [None] * len(input_dicts)
+        if table is not None:
+            table_rows = [table.row_index(encoder, input_dict) for input_dict in input_dicts]
+        live_rows = [row for row, table_row in enumerate(table_rows) if table_row is None]
+        if len(live_rows) == len(input_dicts):
+            with stage_metrics.timer("encode_features"):
+                input_processed = encoder.encode_batch(input_dicts)
+            with stage_metrics.timer("predict"):
+                return self._predict_matrix(input_processed)
+
+        hit_rows = [row for row, table_row in enumerate(table_rows) if table_row is not None]
+        hit_index = [table_rows[row] for row in hit_rows]
+        y_pred_bin = np.empty((len(input_dicts), table.labels.shape[1]), dtype=np.float64)
+        y_pred_proba = np.empty((len(input_dicts), table.proba.shape[1]), dtype=np.float64)
+        y_pred_bin[hit_rows] = table.labels[hit_index]
+        y_pred_proba[hit_rows] = table.proba[hit_index]
+        if live_rows:
+            with stage_metrics.timer("encode_features"):
+                input_processed = encoder.encode_batch([input_dicts[row] for row in live_rows])
+            with stage_metrics.timer("predict"):
+                live_bin, live_proba = self._predict_matrix(input_processed)
+            y_pred_bin[live_rows] = live_bin
+            y_pred_proba[live_rows] = live_proba
+        return y_pred_bin, y_pred_proba
+
+    def _predict_matrix(self, input_processed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        인코딩된 피처 행렬에 대해 (바이너리 라벨, 라벨별 확률)을 체인 한 번 순회로 계산합니다.
+        ClassifierChain.predict()와 predict_proba()는 각각 체인 전체를 (링크마다 두 번씩) 평가하므로,
+        링크별 predict_proba 결과 하나에서 분류기 자신의 결정 규칙(classes_[argmax])으로 라벨을 만들어
+        다음 링크에 전달하고, 양성 클래스 확률은 confidence로 함께 모읍니다.
+        """
+        compiled = self._get_compiled_predictor()
+        if compiled is not None:
+            return compiled.predict(input_processed)
+
+        chain = self.model
+        if getattr(chain, 'chain_method_', 'predict') != 'predict':
+            # 체인 피처로 확률/결정함수를 쓰는 설정은 sklearn 구현을 그대로 사용
+            input_df = pd.DataFrame(input_processed, columns=self.onehot_columns)
+            with stage_metrics.timer("chain_predict"):
+                y_pred_bin = chain.predict(input_df)
+            with stage_metrics.timer("chain_predict_proba"):
+                y_pred_proba = chain.predict_proba(input_df)
+            return y_pred_bin, y_pred_proba
+
+        X = np.asarray(input_processed, dtype=np.float64)
+        n_links = len(chain.estimators_)
+        y_label_chain = np.zeros((X.shape[0], n_links))
+        y_proba_chain = np.zeros((X.shape[0], n_links))
+        for chain_idx, estimator in enumerate(chain.estimators_):
+            X_aug = np.hstack((X, y_label_chain[:, :chain_idx]))
+            proba = estimator.predict_proba(X_aug)
+            # RandomForestClassifier.predict와 동일한 결정 규칙
+            y_label_chain[:, chain_idx] = estimator.classes_.take(np.argmax(proba, axis=1), axis=0)
+            # 이진 분류에서 predict_proba가 반환하는 양성 클래스(classes_[-1]) 확률
+            y_proba_chain[:, chain_idx] = proba[:, -1]
+
+        inv_order = np.empty_like(chain.order_)
+        inv_order[chain.order_] = np.arange(len(chain.order_))
+        return y_label_chain[:, inv_order], y_proba_chain[:, inv_order]
+
     def get_recommendation_reason(self, predicted_categories: List[str], age: int, 
                                  gender: str, mbti: str, season: str) -> str:
         """추천 이유를 생성합니다."""
@@ -439,16 +982,43 @@ class PerfumeRecommendationModel:
         """모델을 저장합니다."""
         try:
             os.makedirs(os.path.dirname(self.model_filepath), exist_ok=True)
+            model = self.model
+            forest_arrays = None
+            compiled_predictor = None
+            forest_version = None
+            if self.artifact_format == "forest_arrays" and ForestArrays.supports(model):
+                # 트리 노드는 메모리 매핑용 .npy로 따로 저장하고 pickle에는 트리를 뺀 체인만 넣음
+                forest_arrays = ForestArrays.from_chain(model)
+                forest_dirpath = ForestArrays.new_version_dirpath(self._forest_rootpath())
+                forest_arrays.save(forest_dirpath)
+                if CompiledChainPredictor.supports(model):
+                    compiled_predictor = CompiledChainPredictor.compile(model, forest_arrays)
+                    compiled_predictor.save(forest_dirpath)
+                forest_version = os.path.basename(forest_dirpath)
+                model = ForestArrays.strip_trees(model)
             model_data = {
-                'model': self.model,
+                'model': model,
+                'forest_arrays_version': forest_version,
                 'label_encoders': self.label_encoders,
                 'scaler': self.scaler,
                 'mlb': self.mlb,  # MultiLabelBinarizer 추가
                 'is_trained': self.is_trained,
                 'last_retrain_date': self.last_retrain_date,
-                'onehot_columns': self.onehot_columns # One-hot 컬럼 순서 저장
+                'onehot_columns': self.onehot_columns, # One-hot 컬럼 순서 저장
+                'forest_generations': self.forest_generations,  # 증분 업데이트로 추가된 트리 묶음 정보
+                'forest_generation_count': self.forest_generation_count,  # 트리 묶음 시드용 누적 카운터
+                **self.get_search_state()  # GridSearchCV 최적 파라미터와 점수 이력
             }
-            joblib.dump(model_data, self.model_filepath)
+            # 다른 워커가 읽는 중일 수 있으므로 임시 파일에 쓴 뒤 교체
+            tmp_filepath = self.model_filepath + ".tmp"
+            joblib.dump(model_data, tmp_filepath)
+            os.replace(tmp_filepath, self.model_filepath)
+            if forest_version:
+                ForestArrays.remove_old_versions(self._forest_rootpath())
+            self._forest_version = forest_version
+            if forest_arrays is not None:
+                self._forest_arrays = forest_arrays
+                self._compiled_predictor = compiled_predictor
             print(f"[DEBUG] 모델 저장 시도: {self.model_filepath}")
             print(f"Model saved to {self.model_filepath}")
         except Exception as e:
@@ -459,13 +1029,30 @@ class PerfumeRecommendationModel:
         try:
             if os.path.exists(self.model_filepath):
                 model_data = joblib.load(self.model_filepath)
-                self.model = model_data['model']
+                forest_version = model_data.get('forest_arrays_version')
+                if forest_version:
+                    # 트리 배열은 메모리 매핑만 하고 sklearn 트리는 self.model에 처음 접근할 때 구성
+                    forest_dirpath = os.path.join(self._forest_rootpath(), forest_version)
+                    forest_arrays = ForestArrays.load(forest_dirpath)
+                    self.model = None
+                    self._model_skeleton = model_data['model']
+                    self._forest_arrays = forest_arrays
+                    if CompiledChainPredictor.exists(forest_dirpath):
+                        self._compiled_predictor = CompiledChainPredictor.load(forest_dirpath, forest_arrays)
+                else:
+                    self.model = model_data['model']
+                self._forest_version = forest_version
                 self.label_encoders = model_data['label_encoders']
                 self.scaler = model_data['scaler']
                 self.mlb = model_data['mlb']  # MultiLabelBinarizer 로드
                 self.is_trained = model_data['is_trained']
                 self.last_retrain_date = model_data['last_retrain_date']
                 self.onehot_columns = model_data['onehot_columns'] # One-hot 컬럼 순서 로드
+                self.set_search_state(model_data)
+                self.forest_generations = model_data.get('forest_generations')
+                self.forest_generation_count = model_data.get('forest_generation_count', 0)
+                self._reset_prediction_state()
+                self._load_prediction_table()
                 print("모델 로드 완료!")
             else:
                 print("저장된 모델 파일이 없습니다. 새로 훈련합니다.")
@@ -479,54 +1066,9 @@ class PerfumeRecommendationModel:
         """
         복합 향수 카테고리를 리스트로 변환하고, 각 항목을 표준 카테고리(영문)로 강력하게 매핑합니다.
         유사 카테고리를 통합하여 데이터 품질과 모델 성능을 향상시킵니다.
+        (매핑 규칙은 category_normalizer.CATEGORY_KEYWORD_MAP, Series 전체는 category_normalizer.normalize_series 사용)
         """
-        import re
-        if pd.isna(category_text):
-            return []
-        
-        # 명확성과 유지보수성을 위해 재구성된 매핑 규칙
-        # 유사 카테고리를 통합하고, 긴 키워드를 우선적으로 매칭합니다.
-        mapping = {
-            # Floral 계열 (통합)
-            '화이트 플로럴': 'floral', '라이트 플로럴': 'floral', '플로럴': 'floral', 'white floral': 'floral', 'light floral': 'floral',
-            '장미': 'floral', 'rose': 'floral', '자스민': 'floral', '백합': 'floral', '꽃': 'floral',
-            # Woody 계열 (통합)
-            '우디': 'woody', '우드': 'woody', '나무': 'woody', '샌달우드': 'woody', '시더우드': 'woody', '숲': 'woody', '오리엔탈': 'woody', '신비': 'woody',
-            # Citrus 계열
-            '시트러스': 'citrus', '상큼': 'citrus', '레몬': 'citrus', '자몽': 'citrus', '베르가못': 'citrus',
-            # 기타 주요 카테고리 (한글/영문/유사어 포함)
-            '머스크': 'musk', '포근': 'musk',
-            '아쿠아틱': 'aquatic', '바다': 'aquatic', '비누': 'aquatic',
-            '그린': 'green', '풀': 'green', '허브': 'green', '스파이시': 'green', '후추': 'green',
-            '아로마틱': 'aromatic', '라벤더': 'aromatic',
-            '프루티': 'fruity', '과일': 'fruity',
-            '구르망': 'gourmand', '달콤': 'gourmand', '바닐라': 'gourmand',
-            '파우더리': 'powdery', '파우더': 'powdery',
-            '시프레': 'chypre', '푸제르': 'fougere', '앰버': 'amber',
-            '캐쥬얼': 'casual', '일상': 'casual',
-            '코지': 'cozy', '커피': 'cozy',
-        }
-        # 긴 키워드가 먼저 매칭되도록 정렬 (e.g., '화이트 플로럴'이 '플로럴'보다 먼저)
-        sorted_keys = sorted(mapping.keys(), key=len, reverse=True)
-
-        def clean_label(label):
-            label = str(label)
-            label = re.sub(r'\([^)]*\)', '', label)  # 괄호와 내용 제거
-            label = re.sub(r'[^\w가-힣 ]', '', label)  # 특수문자 제거
-            label = label.strip().lower()
-            return label
-        raw_cats = re.split(r'[,/]', str(category_text))
-        result = set()
-        for raw in raw_cats:
-            cleaned = clean_label(raw)
-            if not cleaned:
-                continue
-            # 정렬된 키로 매칭하여 가장 구체적인 키워드를 먼저 찾음
-            for key in sorted_keys:
-                if key in cleaned:
-                    result.add(mapping[key])
-                    break
-        return list(result) 
+        return category_normalizer.normalize(category_text)
 
     NOTE_CATEGORY_MAP = {
         "top": ["citrus", "fruity", "aquatic", "green"],
@@ -0,0 +1,71 @@
+import hashlib
+import os
+from typing import Optional
+
+import pandas as pd
+
+
+class TrainingDataSnapshot:
+    """
+    전처리가 끝난 엑셀 훈련 데이터를 Arrow IPC 파일로 저장해 두는 스냅샷.
+    파일 이름에 원본 워크북의 내용 해시를 넣어, 워크북이 바뀌면 새 스냅샷을 만들고 이전 스냅샷은 지웁니다.
+    pyarrow가 설치되어 있지 않으면 스냅샷 없이 동작합니다 (호출 측이 워크북을 직접 읽음).
+    """
+
+    SUFFIX = ".arrow"
+    HASH_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, dirpath: str):
+        self.dirpath = dirpath
+
+    @classmethod
+    def source_hash(cls, filepath: str) -> str:
+        """원본 파일 내용의 sha256 해시를 반환합니다."""
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path_for(self, source_hash: str) -> str:
+        return os.path.join(self.dirpath, source_hash + self.SUFFIX)
+
+    def load(self, source_hash: str) -> Optional[pd.DataFrame]:
+        """해시가 일치하는 스냅샷을 메모리 매핑으로 읽어 DataFrame으로 반환합니다 (없으면 None)."""
+        path = self.path_for(source_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return None
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+        # Arrow list 컬럼은 NumPy 배열로 복원되므로 원래처럼 list로 변환
+        for field in table.schema:
+            if pa.types.is_list(field.type):
+                df[field.name] = [list(value) for value in df[field.name]]
+        return df
+
+    def save(self, df: pd.DataFrame, source_hash: str) -> bool:
+        """DataFrame을 스냅샷으로 저장하고 다른 해시의 스냅샷은 삭제합니다. 저장하지 못하면 False를 반환합니다."""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return False
+        os.makedirs(self.dirpath, exist_ok=True)
+        path = self.path_for(source_hash)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        # 다른 프로세스가 읽는 중일 수 있으므로 임시 파일에 쓴 뒤 교체
+        with pa.OSFile(path + ".tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(path + ".tmp", path)
+        for filename in os.listdir(self.dirpath):
+            if filename.endswith(self.SUFFIX) and filename != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(self.dirpath, filename))
+                except OSError:
+                    pass
+        return True
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session, selectinload
+
+from backend.app.database import Perfume
+from backend.app.schemas import PerfumeDetail
+
+
+class CatalogSnapshot:
+    """한 시점의 향수 카탈로그: 카테고리별 향수 ID 배열과 ID별 PerfumeDetail."""
+
+    def __init__(self, details: Dict[int, PerfumeDetail]):
+        self.details = details
+        self.all_ids = np.array(sorted(details), dtype=np.int64)
+        ids_by_category = {}
+        for perfume_id in self.all_ids.tolist():
+            ids_by_category.setdefault(details[perfume_id].category, []).append(perfume_id)
+        self.ids_by_category = {
+            category: np.array(ids, dtype=np.int64) for category, ids in ids_by_category.items()
+        }
+        self.loaded_at = time.monotonic()
+
+
+class PerfumeCatalog:
+    """
+    추천 시 향수 선택에 쓰는 프로세스 내 향수 카탈로그 (read-through 캐시).
+    처음 조회할 때 향수와 제조법을 한 번에 읽어 카테고리 -> ID 배열, ID -> PerfumeDetail로 만들어 두고,
+    이후에는 DB 조회 없이 카테고리에서 무작위로 하나를 고릅니다.
+    향수 CRUD 엔드포인트가 쓰기 후 invalidate()를 호출하면 다음 조회 때 다시 읽습니다.
+    변경된 향수만 고치지 않고 전체 카탈로그(제조법 포함)를 다시 읽으므로, 쓰기가 잦으면 그만큼 전체 조회가 늘어납니다.
+    다시 읽는 도중 무효화되면 읽은 카탈로그는 그 요청에만 쓰고 저장하지 않습니다 (쓰기 전 내용이 ttl 동안 남지 않도록).
+    다른 프로세스(init_data.py 등)의 변경은 ttl초가 지나면 반영됩니다 (0 이하이면 만료 없음).
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()  # 다시 읽기를 한 번에 하나만 수행
+        self._version_lock = threading.Lock()
+        self._version = 0  # 무효화마다 증가 (무효화 전에 읽은 카탈로그가 저장되지 않도록)
+        self.loads = 0
+        self.invalidations = 0
+        self.discarded_loads = 0
+
+    def invalidate(self):
+        """다음 조회 때 카탈로그를 DB에서 다시 읽도록 합니다."""
+        with self._version_lock:
+            self._version += 1
+            self._snapshot = None
+            self.invalidations += 1
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        if snapshot is None:
+            return False
+        return self.ttl <= 0 or time.monotonic() - snapshot.loaded_at < self.ttl
+
+    def get_snapshot(self, db: Session) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        with self._lock:
+            # 다른 요청이 먼저 다시 읽었으면 그 결과를 사용
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+            version = self._version
+            perfumes = db.query(Perfume).options(selectinload(Perfume.recipes)).all()
+            snapshot = CatalogSnapshot({perfume.id: PerfumeDetail.model_validate(perfume) for perfume in perfumes})
+            self.loads += 1
+            with self._version_lock:
+                if self._version == version:
+                    self._snapshot = snapshot
+                else:
+                    self.discarded_loads += 1
+            return snapshot
+
+    def choose(self, db: Session, categories: List[str]) -> Optional[Tuple[str, PerfumeDetail]]:
+        """
+        categories 순서대로 향수가 있는 첫 카테고리에서 무작위로 하나를 고릅니다.
+        어느 카테고리에도 향수가 없으면 전체 향수에서 고르고, 향수가 하나도 없으면 None을 반환합니다.
+        반환값의 카테고리는 향수가 있는 카테고리를 찾지 못한 경우 categories[0]입니다.
+        """
+        snapshot = self.get_snapshot(db)
+        for category in categories:
+            ids = snapshot.ids_by_category.get(category)
+            if ids is not None and len(ids):
+                return category, snapshot.details[int(ids[random.randrange(len(ids))])]
+        if not len(snapshot.all_ids):
+            return None
+        perfume_id = int(snapshot.all_ids[random.randrange(len(snapshot.all_ids))])
+        return categories[0] if categories else None, snapshot.details[perfume_id]
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'loaded': snapshot is not None,
+            'perfumes': len(snapshot.all_ids) if snapshot is not None else 0,
+            'categories': len(snapshot.ids_by_category) if snapshot is not None else 0,
+            'ttl': self.ttl,
+            'loads': self.loads,
+            'invalidations': self.invalidations,
+            'discarded_loads': self.discarded_loads,
+        }
+
+
+class PerfumeDetailCache:
+    """
+    향수 상세 응답(PerfumeDetail JSON 바이트)과 ETag를 향수 ID별로 보관하는 LRU 캐시.
+    향수 수정/삭제/제조법 추가 엔드포인트가 invalidate(perfume_id)를 호출하고,
+    다른 프로세스의 변경은 ttl초가 지나면 반영됩니다 (0 이하이면 만료 없음).
+    ETag는 응답 본문의 해시이므로 다시 읽은 내용이 같으면 ETag도 같습니다.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[bytes, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0  # 무효화마다 증가 (무효화 전에 읽은 내용이 캐시에 들어가지 않도록)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def get(self, db: Session, perfume_id: int) -> Optional[Tuple[bytes, str]]:
+        """(JSON 바이트, ETag)를 반환합니다. 향수가 없으면 None."""
+        with self._lock:
+            entry = self._entries.get(perfume_id)
+            if entry is not None and (self.ttl <= 0 or time.monotonic() - entry[2] < self.ttl):
+                self._entries.move_to_end(perfume_id)
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+            version = self._version
+
+        # 제조법까지 한 번에 읽음 (직렬화 중 지연 로딩 쿼리 없음)
+        perfume = db.query(Perfume).options(selectinload(Perfume.recipes)).filter(Perfume.id == perfume_id).first()
+        if perfume is None:
+            return None
+        body = PerfumeDetail.model_validate(perfume).model_dump_json().encode("utf-8")
+        etag = self.make_etag(body)
+
+        with self._lock:
+            if version == self._version and self.max_entries > 0:
+                self._entries[perfume_id] = (body, etag, time.monotonic())
+                self._entries.move_to_end(perfume_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return body, etag
+
+    def invalidate(self, perfume_id: Optional[int] = None):
+        """perfume_id의 캐시를 지웁니다 (None이면 전체)."""
+        with self._lock:
+            if perfume_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(perfume_id, None)
+            self._version += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
+
+
+# 전역 카탈로그 인스턴스 (추천 API가 읽고, 향수 API가 쓰기 후 무효화)
+perfume_catalog = PerfumeCatalog(ttl=float(os.getenv("PERFUME_CATALOG_TTL", "300")))
+
+# 전역 향수 상세 캐시 (향수 상세 API가 읽고, 향수 수정/삭제/제조법 추가 후 무효화)
+perfume_detail_cache = PerfumeDetailCache(
+    max_entries=int(os.getenv("PERFUME_DETAIL_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PERFUME_DETAIL_CACHE_TTL", "300")),
+)
@@ -0,0 +1,320 @@
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.database import IdSequence, Recommendation, SessionLocal
+
+
+class RecommendationPending(Exception):
+    """저장 중인 추천 기록의 저장이 feedback_wait_ms 안에 끝나지 않았을 때 발생합니다 (API에서는 503으로 응답)."""
+
+
+class RecommendationLog:
+    """
+    추천 기록(Recommendation)의 write-behind 로그.
+
+    추천 ID는 id_sequences 테이블에서 id_block_size개씩 미리 예약한 블록에서 DB 왕복 없이 할당하고,
+    기록은 메모리에 모았다가 flush_interval_ms마다 또는 flush_max_rows개가 쌓이면 백그라운드 스레드가
+    한 번의 bulk insert로 저장합니다. bulk insert가 실패하면 같은 묶음을 한 행씩 다시 저장해 저장 가능한 행은 바로 저장하고,
+    실패한 행만 대기열에 되돌려 다음 주기에 다시 시도합니다 (실패가 이어지면 저장 주기를 최대 max_backoff_ms까지 늘림).
+    max_retries번 실패한 행과 대기열이 max_queued개를 넘어 밀려난 오래된 행은 버리고,
+    최근 dead_letter_size개를 dead_letters에 오류와 함께 남깁니다 (개수는 stats()로 확인).
+    대기 중인 기록에 반영한 피드백이 그 기록과 함께 버려지면 lost_feedback으로 셉니다.
+    close()는 남은 기록을 저장합니다 (서버 정상 종료 시 호출).
+    아직 저장되지 않은 추천에 대한 피드백은 대기 중인 기록에 바로 반영합니다.
+    enabled=False이면 기록할 때마다 바로 저장합니다.
+    """
+
+    SEQUENCE_NAME = Recommendation.__tablename__
+
+    def __init__(self, session_factory: Callable[[], object], flush_interval_ms: float = 200.0,
+                 flush_max_rows: int = 500, id_block_size: int = 1000, enabled: bool = True,
+                 max_retries: int = 8, max_queued: int = 100000, max_backoff_ms: float = 30000.0,
+                 dead_letter_size: int = 100, feedback_wait_ms: float = 5000.0):
+        self.session_factory = session_factory
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_rows = flush_max_rows
+        self.id_block_size = id_block_size
+        self.enabled = enabled
+        self.max_retries = max_retries
+        self.max_queued = max_queued
+        self.max_backoff_ms = max_backoff_ms
+        self.feedback_wait_ms = feedback_wait_ms
+        self._queued: "OrderedDict[int, Dict]" = OrderedDict()  # 저장 대기 중인 기록
+        self._inflight: Dict[int, Dict] = {}  # 저장 중인 기록
+        self._attempts: Dict[int, int] = {}  # 기록 ID별 저장 실패 횟수
+        self._consecutive_failures = 0  # 실패한 행이 남은 저장 주기가 연속된 횟수 (백오프용)
+        self.dead_letters = deque(maxlen=dead_letter_size)  # 버린 기록과 오류 (최근 것만)
+        self._next_id = 0
+        self._block_end = 0  # 예약된 블록의 끝 (미포함)
+        self._id_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # 관측용 지표
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.retried_rows = 0
+        self.dropped_rows = 0
+        self.lost_feedback = 0
+        self.blocks_reserved = 0
+        self.pending_feedback_updates = 0
+
+    def _reserve_block(self):
+        """id_sequences에서 ID 블록을 원자적으로 예약합니다 (UPDATE가 먼저 쓰기 잠금을 잡으므로 프로세스 간에도 겹치지 않음)."""
+        for _ in range(3):
+            db = self.session_factory()
+            try:
+                result = db.execute(
+                    update(IdSequence)
+                    .where(IdSequence.name == self.SEQUENCE_NAME)
+                    .values(next_value=IdSequence.next_value + self.id_block_size)
+                )
+                if result.rowcount == 0:
+                    # 시퀀스가 없으면 기존 추천 기록의 최대 ID 다음부터 시작
+                    start = (db.execute(select(func.max(Recommendation.id))).scalar() or 0) + 1
+                    db.add(IdSequence(name=self.SEQUENCE_NAME, next_value=start + self.id_block_size))
+                else:
+                    start = db.execute(
+                        select(IdSequence.next_value).where(IdSequence.name == self.SEQUENCE_NAME)
+                    ).scalar() - self.id_block_size
+                db.commit()
+            except IntegrityError:
+                # 다른 프로세스가 동시에 시퀀스를 만든 경우: 다시 예약
+                db.rollback()
+                continue
+            finally:
+                db.close()
+            self._next_id = start
+            self._block_end = start + self.id_block_size
+            self.blocks_reserved += 1
+            return
+        raise RuntimeError("추천 기록 ID 블록을 예약하지 못했습니다")
+
+    def allocate_id(self) -> int:
+        with self._id_lock:
+            if self._next_id >= self._block_end:
+                self._reserve_block()
+            recommendation_id = self._next_id
+            self._next_id += 1
+            return recommendation_id
+
+    def record(self, perfume_id: int, confidence_score: float, reason: str) -> int:
+        """추천 기록을 대기열에 넣고 할당된 추천 ID를 반환합니다."""
+        row = {
+            'id': self.allocate_id(),
+            'perfume_id': perfume_id,
+            'confidence_score': confidence_score,
+            'reason': reason,
+            'created_at': datetime.utcnow(),
+            'is_liked': None,
+        }
+        with self._cond:
+            self._queued[row['id']] = row
+            self.recorded += 1
+            self._trim_queue()
+            if len(self._queued) >= self.flush_max_rows:
+                self._cond.notify_all()
+        if not self.enabled:
+            self.flush()
+        else:
+            self._ensure_thread()
+        return row['id']
+
+    def set_feedback(self, recommendation_id: int, is_liked: bool) -> bool:
+        """
+        아직 저장되지 않은 추천이면 대기 중인 기록에 피드백을 반영하고 True를 반환합니다.
+        저장 중인 기록이면 저장이 끝날 때까지 기다린 뒤 False를 반환합니다 (호출 측이 DB에서 갱신).
+        feedback_wait_ms 안에 저장이 끝나지 않으면 RecommendationPending을 발생시킵니다.
+        """
+        deadline = time.monotonic() + self.feedback_wait_ms / 1000.0
+        with self._cond:
+            while True:
+                row = self._queued.get(recommendation_id)
+                if row is not None:
+                    row['is_liked'] = is_liked
+                    self.pending_feedback_updates += 1
+                    return True
+                if recommendation_id not in self._inflight:
+                    return False
+                # 저장 실패로 대기열에 되돌아오면 다시 확인
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RecommendationPending(f"추천 기록 {recommendation_id}을 저장하는 중입니다")
+                self._cond.wait(timeout=remaining)
+
+    def _trim_queue(self):
+        """대기열이 max_queued개를 넘으면 가장 오래된 기록부터 버립니다 (self._cond를 잡은 상태에서 호출)."""
+        while len(self._queued) > self.max_queued:
+            _, row = self._queued.popitem(last=False)
+            self._drop(row, "대기열이 가득 찼습니다")
+
+    def _drop(self, row: Dict, error: str):
+        self._attempts.pop(row['id'], None)
+        self.dropped_rows += 1
+        self.dead_letters.append({**row, 'error': error})
+        if row.get('is_liked') is not None:
+            self.lost_feedback += 1
+            print(f"추천 기록 {row['id']}에 반영된 피드백(is_liked={row['is_liked']})도 함께 버려졌습니다.")
+        print(f"추천 기록 {row['id']} 저장을 포기했습니다: {error}")
+
+    def _insert_rows(self, rows: List[Dict]):
+        db = self.session_factory()
+        try:
+            db.execute(insert(Recommendation), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_each(self, rows: "OrderedDict[int, Dict]") -> Dict[int, str]:
+        """기록을 한 행씩 저장하고 저장하지 못한 행의 ID별 오류 메시지를 반환합니다."""
+        failed = {}
+        for recommendation_id, row in rows.items():
+            try:
+                self._insert_rows([row])
+            except Exception as e:
+                failed[recommendation_id] = f"{e.__class__.__name__}: {e}"
+        return failed
+
+    def flush(self) -> int:
+        """
+        대기 중인 기록을 한 번의 bulk insert로 저장하고 저장한 행 수를 반환합니다.
+        bulk insert가 실패하면 한 행씩 다시 저장하고, 실패한 행은 max_retries번까지 대기열에 되돌립니다.
+        """
+        with self._flush_lock:
+            with self._cond:
+                if not self._queued:
+                    return 0
+                rows, self._queued = self._queued, OrderedDict()
+                self._inflight = rows
+            failed = {}
+            try:
+                self._insert_rows(list(rows.values()))
+            except Exception:
+                traceback.print_exc()
+                print(f"추천 기록 {len(rows)}개 일괄 저장 실패, 한 행씩 다시 저장합니다.")
+                self.failed_flushes += 1
+                failed = self._insert_each(rows)
+
+            retry = OrderedDict()
+            with self._cond:
+                for recommendation_id, error in failed.items():
+                    attempts = self._attempts.get(recommendation_id, 0) + 1
+                    if attempts >= self.max_retries:
+                        self._drop(rows[recommendation_id], error)
+                    else:
+                        self._attempts[recommendation_id] = attempts
+                        retry[recommendation_id] = rows[recommendation_id]
+                for recommendation_id in rows:
+                    if recommendation_id not in failed:
+                        self._attempts.pop(recommendation_id, None)
+                if retry:
+                    # 실패한 행을 새로 들어온 기록보다 앞에 되돌림
+                    self.retried_rows += len(retry)
+                    retry.update(self._queued)
+                    self._queued = retry
+                    self._trim_queue()
+                self._consecutive_failures = self._consecutive_failures + 1 if retry else 0
+                saved = len(rows) - len(failed)
+                self._inflight = {}
+                self.flushed += saved
+                if saved:
+                    self.flushes += 1
+                self._cond.notify_all()
+            return saved
+
+    def _wait_timeout(self) -> float:
+        """다음 저장까지 기다릴 시간(초). 실패가 이어지면 두 배씩 늘려 DB 장애 중 재시도 횟수를 줄입니다."""
+        interval_ms = self.flush_interval_ms * (2 ** min(self._consecutive_failures, 16))
+        return min(interval_ms, max(self.max_backoff_ms, self.flush_interval_ms)) / 1000.0
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._closed:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recommendation-log", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._consecutive_failures:
+                    # 저장 실패 중에는 대기열이 차도 백오프 시간만큼 기다림
+                    if not self._closed:
+                        self._cond.wait(timeout=self._wait_timeout())
+                elif not self._closed and len(self._queued) < self.flush_max_rows:
+                    self._cond.wait(timeout=self.flush_interval_ms / 1000.0)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception:
+                traceback.print_exc()
+            if closed:
+                return
+
+    def close(self):
+        """백그라운드 저장을 멈추고 남은 기록을 모두 저장합니다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+        if self._queued:
+            print(f"추천 기록 {len(self._queued)}개를 저장하지 못하고 종료합니다.")
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'flush_interval_ms': self.flush_interval_ms,
+            'flush_max_rows': self.flush_max_rows,
+            'id_block_size': self.id_block_size,
+            'queued': len(self._queued),
+            'inflight': len(self._inflight),
+            'recorded': self.recorded,
+            'flushed': self.flushed,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'retried_rows': self.retried_rows,
+            'dropped_rows': self.dropped_rows,
+            'dead_letters': len(self.dead_letters),
+            'lost_feedback': self.lost_feedback,
+            'max_retries': self.max_retries,
+            'max_queued': self.max_queued,
+            'blocks_reserved': self.blocks_reserved,
+            'pending_feedback_updates': self.pending_feedback_updates,
+        }
+
+
+def create_recommendation_log() -> RecommendationLog:
+    """환경 변수 설정으로 추천 기록 write-behind 로그를 생성합니다."""
+    return RecommendationLog(
+        SessionLocal,
+        flush_interval_ms=float(os.getenv("RECOMMENDATION_LOG_FLUSH_MS", "200")),
+        flush_max_rows=int(os.getenv("RECOMMENDATION_LOG_FLUSH_ROWS", "500")),
+        id_block_size=int(os.getenv("RECOMMENDATION_ID_BLOCK_SIZE", "1000")),
+        enabled=os.getenv("RECOMMENDATION_WRITE_BEHIND", "true").lower() in ("1", "true", "yes"),
+        max_retries=int(os.getenv("RECOMMENDATION_LOG_MAX_RETRIES", "8")),
+        max_queued=int(os.getenv("RECOMMENDATION_LOG_MAX_QUEUED", "100000")),
+        max_backoff_ms=float(os.getenv("RECOMMENDATION_LOG_MAX_BACKOFF_MS", "30000")),
+        feedback_wait_ms=float(os.getenv("RECOMMENDATION_LOG_FEEDBACK_WAIT_MS", "5000")),
+    )
+
+
+# 전역 추천 기록 로그 (추천 API가 기록하고, 서버 종료 시 main.py에서 close)
+recommendation_log = create_recommendation_log()
@@ -0,0 +1,97 @@
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+class RetrainJob:
+    """백그라운드 모델 재훈련 작업의 상태."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued -> running -> succeeded / failed
+        self.stage = None
+        self.progress = 0.0
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+
+class RetrainJobManager:
+    """
+    피드백 기반 재훈련을 요청 스레드 밖에서 실행합니다.
+    서빙 중인 모델은 건드리지 않고 새 모델 인스턴스를 훈련한 뒤, 성공하면 on_success(new_model)로 한 번에 교체합니다.
+    동시에 하나의 작업만 실행하며, 실행 중에 다시 요청하면 진행 중인 작업을 반환합니다.
+    """
+
+    MAX_HISTORY = 20
+
+    def __init__(self, model_factory: Callable[[], object], session_factory: Callable[[], object],
+                 on_success: Callable[[object], None]):
+        self.model_factory = model_factory
+        self.session_factory = session_factory
+        self.on_success = on_success
+        self._jobs = OrderedDict()
+        self._active: Optional[RetrainJob] = None
+        self._lock = threading.Lock()
+
+    def submit(self) -> RetrainJob:
+        """재훈련 작업을 시작하고 작업 정보를 바로 반환합니다."""
+        with self._lock:
+            if self._active is not None:
+                return self._active
+            job = RetrainJob()
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.MAX_HISTORY:
+                self._jobs.popitem(last=False)
+        thread = threading.Thread(target=self._run, args=(job,), name=f"retrain-{job.id[:8]}", daemon=True)
+        thread.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[RetrainJob]:
+        return self._jobs.get(job_id)
+
+    def _on_progress(self, job: RetrainJob, stage: str, progress: float):
+        job.stage = stage
+        job.progress = progress
+
+    def _run(self, job: RetrainJob):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            new_model = self.model_factory()
+            new_model.retrain_with_feedback(
+                db, progress_callback=lambda stage, progress: self._on_progress(job, stage, progress)
+            )
+            if not new_model.is_trained:
+                raise RuntimeError("재훈련된 모델이 없습니다 (훈련 데이터를 확인하세요)")
+            self._on_progress(job, "swapping", 0.98)
+            self.on_success(new_model)
+            job.status = "succeeded"
+            self._on_progress(job, "done", 1.0)
+        except Exception as e:
+            traceback.print_exc()
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            db.close()
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                self._active = None
@@ -10,11 +10,17 @@ class ModelRetrainScheduler:
         self.recommendation_model = PerfumeRecommendationModel()
         self.is_running = False
     
+    def _ensure_model_loaded(self):
+        """저장된 모델(최적 파라미터, 마지막 재훈련 시각 포함)을 처음 한 번 로드합니다."""
+        if not self.recommendation_model.is_trained:
+            self.recommendation_model.load_model()
+
     def retrain_job(self):
         """정기적인 모델 재훈련 작업"""
         print(f"[{datetime.now()}] 모델 재훈련 작업 시작...")
         
         try:
+            self._ensure_model_loaded()
             db = SessionLocal()
             self.recommendation_model.retrain_with_feedback(db)
             db.close()
@@ -22,6 +28,22 @@ class ModelRetrainScheduler:
         except Exception as e:
             print(f"[{datetime.now()}] 모델 재훈련 실패: {e}")
     
+    def incremental_update_job(self):
+        """새 피드백만으로 기존 포레스트에 트리를 추가하는 증분 업데이트 작업 (실패 시 전체 재훈련)"""
+        print(f"[{datetime.now()}] 모델 증분 업데이트 시작...")
+        
+        try:
+            self._ensure_model_loaded()
+            db = SessionLocal()
+            try:
+                self.recommendation_model.update_with_feedback(db)
+            finally:
+                db.close()
+            print(f"[{datetime.now()}] 모델 증분 업데이트 완료")
+        except Exception as e:
+            print(f"[{datetime.now()}] 모델 증분 업데이트 실패, 전체 재훈련으로 대체합니다: {e}")
+            self.retrain_job()
+    
     def start_scheduler(self):
         """스케줄러를 시작합니다."""
         if self.is_running:
@@ -44,6 +66,7 @@ class ModelRetrainScheduler:
     def check_feedback_threshold(self):
         """피드백 데이터 임계값을 확인합니다."""
         try:
+            self._ensure_model_loaded()
             db = SessionLocal()
             from app.database import Recommendation
             
@@ -55,8 +78,8 @@ class ModelRetrainScheduler:
                 ).count()
                 
                 if new_feedback_count >= 50:  # 50개 이상의 새 피드백이 있으면 재훈련
-                    print(f"새로운 피드백 {new_feedback_count}개 발견. 즉시 재훈련 시작...")
-                    self.retrain_job()
+                    print(f"새로운 피드백 {new_feedback_count}개 발견. 즉시 증분 업데이트 시작...")
+                    self.incremental_update_job()
             
             db.close()
         except Exception as e:
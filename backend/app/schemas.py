@@ -42,6 +42,25 @@ class PerfumeRecipe(PerfumeRecipeBase):
     class Config:
         from_attributes = True
 
+# 대량 등록용 향수 (제조법을 함께 등록할 수 있음)
+class PerfumeBulkItem(PerfumeCreate):
+    recipes: List[PerfumeRecipeCreate] = []
+
+# 대량 등록 결과 (행별 오류 포함)
+class PerfumeBulkError(BaseModel):
+    row: int
+    name: Optional[str] = None
+    error: str
+
+class PerfumeBulkResult(BaseModel):
+    received: int
+    created: int
+    recipes_created: int
+    duplicates: int
+    failed: int
+    errors: List[PerfumeBulkError]
+    errors_truncated: bool
+
 # 향수 상세 정보 (제조법 포함)
 class PerfumeDetail(Perfume):
     recipes: List[PerfumeRecipe] = []
@@ -66,6 +85,19 @@ class RecommendationResponse(BaseModel):
     match_factors: List[str]
     notes_recommendation: Optional[dict] = None  # top/middle/base별 추천 향조와 신뢰도
 
+# 배치 추천 요청 스키마 (여러 사용자 프로필을 한 번에 예측)
+class BatchRecommendationRequest(BaseModel):
+    profiles: List[RecommendationRequest]
+
+# 배치 추천 결과 (프로필별 예측 카테고리/신뢰도/노트 추천)
+class BatchRecommendationItem(BaseModel):
+    predicted_categories: List[str]
+    confidence_dict: dict
+    notes_recommendation: dict
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[BatchRecommendationItem]
+
 # 추천 피드백 스키마
 class RecommendationFeedback(BaseModel):
     is_liked: bool
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# 단계별 소요 시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# 요청 하나의 단계별 소요 시간 (ms). Server-Timing 헤더를 켠 요청에서만 미들웨어가 dict를 설정
+# (스레드풀에서 실행되는 코드도 요청의 컨텍스트를 복사해 받으므로 같은 dict에 기록됨)
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stage_timings", default=None)
+
+
+class StageMetrics:
+    """
+    추천 요청 경로의 단계별 소요 시간 히스토그램.
+
+    각 단계는 time.perf_counter()로 잰 시간을 누적 구간별 카운트/합계/횟수로 모으고,
+    /metrics에서 Prometheus 텍스트 형식으로 내보냅니다.
+    추론 워커 프로세스(INFERENCE_WORKERS > 0)에서 실행되는 모델 내부 단계는 그 프로세스에 기록되므로 여기에는 포함되지 않습니다.
+    """
+
+    METRIC_NAME = "recommendation_stage_duration_seconds"
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, enabled: bool = True):
+        self.buckets = tuple(sorted(buckets))
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # 단계명 -> [구간별 카운트 (마지막은 +Inf), 합계, 횟수]
+        self._stages: Dict[str, List] = {}
+
+    def observe(self, stage: str, seconds: float):
+        """단계 하나의 소요 시간을 기록합니다."""
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds * 1000
+        if not self.enabled:
+            return
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += seconds
+            entry[2] += 1
+
+    @contextmanager
+    def timer(self, stage: str):
+        """with 블록의 실행 시간을 stage로 기록합니다 (예외가 나도 기록)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 형식(0.0.4)의 히스토그램을 반환합니다."""
+        with self._lock:
+            stages = {stage: (list(counts), total, count) for stage, (counts, total, count) in self._stages.items()}
+        lines = [
+            f"# HELP {self.METRIC_NAME} Duration of each stage of the recommendation request path.",
+            f"# TYPE {self.METRIC_NAME} histogram",
+        ]
+        for stage in sorted(stages):
+            counts, total, count = stages[stage]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.METRIC_NAME}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.METRIC_NAME}_sum{{stage="{stage}"}} {total!r}')
+            lines.append(f'{self.METRIC_NAME}_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                stage: {
+                    'count': count,
+                    'avg_ms': round(total / count * 1000, 3) if count else 0.0,
+                }
+                for stage, (_, total, count) in self._stages.items()
+            }
+
+
+def start_request_timings() -> Dict[str, float]:
+    """현재 요청의 단계별 시간 기록을 시작하고 기록될 dict를 반환합니다 (Server-Timing 헤더용)."""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def current_request_timings() -> Optional[Dict[str, float]]:
+    """현재 컨텍스트의 요청별 단계 시간 dict (Server-Timing을 끈 요청이면 None)."""
+    return _request_timings.get()
+
+
+def merge_request_timings(timings: Optional[Dict[str, float]], stage_timings: Dict[str, float]):
+    """다른 컨텍스트(마이크로 배치 작업 등)에서 잰 단계 시간을 요청의 단계 시간에 더합니다."""
+    if timings is None:
+        return
+    for stage, duration in stage_timings.items():
+        timings[stage] = timings.get(stage, 0.0) + duration
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """단계별 시간(ms)을 Server-Timing 헤더 값으로 만듭니다."""
+    return ", ".join(f"{stage};dur={duration:.3f}" for stage, duration in timings.items())
+
+
+# 전역 단계별 지표 (RECOMMENDATION_STAGE_METRICS=false이면 히스토그램 기록을 끔)
+stage_metrics = StageMetrics(
+    enabled=os.getenv("RECOMMENDATION_STAGE_METRICS", "true").lower() in ("1", "true", "yes")
+)
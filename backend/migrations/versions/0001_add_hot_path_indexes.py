@@ -0,0 +1,54 @@
+"""add indexes for recommendation and feedback hot paths
+
+Revision ID: 0001_add_hot_path_indexes
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+테이블은 기존처럼 애플리케이션 시작 시 Base.metadata.create_all로 만들어지므로,
+이 마이그레이션은 이미 있는 DB에 없는 인덱스만 추가합니다.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_add_hot_path_indexes'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+FEEDBACK_WHERE = sa.text("is_liked IS NOT NULL")
+
+INDEXES = (
+    # get_recommendation / 카테고리별 향수 조회: WHERE category = ?
+    ('perfumes', 'ix_perfumes_category', ['category'], {}),
+    # prepare_feedback_data: WHERE is_liked = true AND created_at > ?
+    ('recommendations', 'ix_recommendations_is_liked_created_at', ['is_liked', 'created_at'], {}),
+    # check_feedback_threshold: WHERE is_liked IS NOT NULL AND created_at > ? (부분 인덱스, MySQL은 일반 인덱스)
+    ('recommendations', 'ix_recommendations_feedback_created_at', ['created_at'],
+     {'sqlite_where': FEEDBACK_WHERE, 'postgresql_where': FEEDBACK_WHERE}),
+)
+
+
+def _index_exists(table, name):
+    """(테이블 존재 여부, 인덱스 존재 여부). --sql 오프라인 모드에서는 DB를 볼 수 없으므로 테이블만 있다고 가정합니다."""
+    if op.get_context().as_sql:
+        return True, False
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return False, False
+    return True, name in {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    for table, name, columns, kwargs in INDEXES:
+        table_exists, index_exists = _index_exists(table, name)
+        if table_exists and not index_exists:
+            op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade():
+    for table, name, columns, kwargs in reversed(INDEXES):
+        table_exists, index_exists = _index_exists(table, name)
+        if index_exists or (table_exists and op.get_context().as_sql):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,37 @@
+"""add id_sequences table for block-allocated ids
+
+Revision ID: 0002_add_id_sequences
+Revises: 0001_add_hot_path_indexes
+Create Date: 2026-10-17 00:00:00
+
+추천 기록 write-behind가 ID를 블록 단위로 예약할 때 쓰는 시퀀스 테이블입니다.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_add_id_sequences'
+down_revision = '0001_add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(name):
+    if op.get_context().as_sql:
+        return False
+    return name in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if _table_exists('id_sequences'):
+        return
+    op.create_table(
+        'id_sequences',
+        sa.Column('name', sa.String(length=50), primary_key=True),
+        sa.Column('next_value', sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('id_sequences')
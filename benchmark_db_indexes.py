@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+추천/피드백 조회 경로의 인덱스 효과 벤치마크 스크립트
+
+임시 SQLite DB에 추천 기록을 대량으로 만든 뒤, 인덱스가 없을 때와
+(backend/migrations의 0001 마이그레이션과 같은) 인덱스를 만든 뒤의 조회 시간과 쿼리 플랜을 비교합니다.
+
+사용법:
+    python benchmark_db_indexes.py                  # 추천 기록 1,000만 건
+    python benchmark_db_indexes.py --rows 1000000   # 빠르게 확인할 때
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.app.database import Base, Perfume, Recommendation
+from backend.app.models.recommendation_model import PerfumeRecommendationModel
+
+HOT_PATH_INDEXES = (
+    "ix_perfumes_category",
+    "ix_recommendations_is_liked_created_at",
+    "ix_recommendations_feedback_created_at",
+)
+CATEGORIES = ["citrus", "floral", "woody", "musk", "aquatic", "green", "gourmand", "powdery",
+              "fruity", "aromatic", "chypre", "fougere", "amber", "cozy"]
+
+
+def hot_path_indexes():
+    for table in (Perfume.__table__, Recommendation.__table__):
+        for index in table.indexes:
+            if index.name in HOT_PATH_INDEXES:
+                yield index
+
+
+def populate(engine, n_rows, n_perfumes, chunk_size=200000):
+    """향수와 추천 기록을 채웁니다 (피드백 비율: 좋아요 7%, 싫어요 3%, 나머지는 피드백 없음)."""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Perfume), [
+            {"name": f"perfume_{i}", "brand": f"brand_{i % 50}", "category": CATEGORIES[i % len(CATEGORIES)]}
+            for i in range(n_perfumes)
+        ])
+    written = 0
+    start = time.perf_counter()
+    while written < n_rows:
+        size = min(chunk_size, n_rows - written)
+        rows = []
+        for _ in range(size):
+            feedback = rng.random()
+            rows.append({
+                "perfume_id": rng.randint(1, n_perfumes),
+                "confidence_score": rng.random(),
+                "reason": "benchmark",
+                "created_at": now - timedelta(seconds=rng.randint(0, 730 * 86400)),
+                "is_liked": True if feedback < 0.07 else (False if feedback < 0.10 else None),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(Recommendation), rows)
+        written += size
+        print(f"  추천 기록 {written:,}/{n_rows:,} ({time.perf_counter() - start:.0f}초)", end="\r")
+    print()
+
+
+def build_queries(session_factory):
+    """애플리케이션과 같은 조건의 쿼리들 (이름, 실행 함수, 쿼리 플랜 확인용 SQL)."""
+    model = PerfumeRecommendationModel()
+    last_retrain_date = datetime.utcnow() - timedelta(days=7)
+
+    def category_lookup():
+        # get_recommendation: 예측된 카테고리의 향수 조회
+        with session_factory() as db:
+            return len(db.query(Perfume).filter(Perfume.category == "woody").all())
+
+    def feedback_count():
+        # ModelRetrainScheduler.check_feedback_threshold: 마지막 재훈련 이후 새 피드백 개수
+        with session_factory() as db:
+            return db.query(Recommendation).filter(
+                Recommendation.is_liked.isnot(None),
+                Recommendation.created_at > last_retrain_date
+            ).count()
+
+    def feedback_rows():
+        # prepare_feedback_data: 마지막 재훈련 이후 좋아요 피드백 (향수 카테고리 조인)
+        with session_factory() as db:
+            return len(model.prepare_feedback_data(db, since=last_retrain_date))
+
+    def all_feedback_rows():
+        # 전체 재훈련 시 prepare_feedback_data: 모든 좋아요 피드백
+        with session_factory() as db:
+            return len(model.prepare_feedback_data(db))
+
+    return [
+        ("category_lookup", category_lookup,
+         "SELECT * FROM perfumes WHERE category = 'woody'"),
+        ("feedback_count", feedback_count,
+         "SELECT count(*) FROM recommendations WHERE is_liked IS NOT NULL AND created_at > :since"),
+        ("feedback_rows_since", feedback_rows,
+         "SELECT r.created_at, p.category FROM recommendations r JOIN perfumes p ON p.id = r.perfume_id "
+         "WHERE r.is_liked = 1 AND r.created_at IS NOT NULL AND r.created_at > :since"),
+        ("feedback_rows_all", all_feedback_rows,
+         "SELECT r.created_at, p.category FROM recommendations r JOIN perfumes p ON p.id = r.perfume_id "
+         "WHERE r.is_liked = 1 AND r.created_at IS NOT NULL"),
+    ], last_retrain_date
+
+
+def run_queries(engine, queries, since, repeat):
+    results = {}
+    for name, fn, plan_sql in queries:
+        fn()  # 워밍업 (페이지 캐시)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        plan = ""
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                plan = "; ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + plan_sql), {"since": since}))
+        results[name] = (statistics.median(timings), rows, plan)
+        print(f"  {name:<22} {results[name][0]:>10.1f} ms  (결과 {rows:,})  {plan}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천/피드백 조회 인덱스 벤치마크")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="추천 기록 수 (기본 1,000만)")
+    parser.add_argument("--perfumes", type=int, default=5000, help="향수 수")
+    parser.add_argument("--repeat", type=int, default=5, help="쿼리별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--db", default=None, help="SQLite 파일 경로 (기본: 임시 파일, 끝나면 삭제)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="perfume_bench_"), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    session_factory = sessionmaker(bind=engine)
+    try:
+        print(f"벤치마크 DB: {db_path}")
+        Base.metadata.create_all(bind=engine)
+        # 인덱스 추가 전 스키마로 되돌림
+        for index in hot_path_indexes():
+            index.drop(bind=engine)
+        print(f"데이터 생성: 향수 {args.perfumes:,}개, 추천 기록 {args.rows:,}개")
+        populate(engine, args.rows, args.perfumes)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        queries, since = build_queries(session_factory)
+        print("\n[인덱스 없음]")
+        before = run_queries(engine, queries, since, args.repeat)
+
+        start = time.perf_counter()
+        for index in hot_path_indexes():
+            index.create(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"\n인덱스 생성: {time.perf_counter() - start:.1f}초")
+        print("\n[인덱스 추가 후]")
+        after = run_queries(engine, queries, since, args.repeat)
+
+        print("\n쿼리                    인덱스 없음(ms)  인덱스 추가(ms)   개선")
+        for name, _, _ in queries:
+            b, a = before[name][0], after[name][0]
+            print(f"  {name:<22} {b:>14.1f} {a:>16.1f} {b / a if a else float('inf'):>7.1f}x")
+    finally:
+        engine.dispose()
+        if args.db is None:
+            os.remove(db_path)
+            os.rmdir(os.path.dirname(db_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+추론 최적화 경로(피처 인코더, 한 번 순회 체인 예측, 평탄화 예측기, 사전 계산 테이블, 예측 캐시)가
+sklearn ClassifierChain과 같은 결과를 내는지 확인합니다. 모델 파일 없이 작은 합성 데이터로 학습합니다.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.multioutput import ClassifierChain
+from sklearn.preprocessing import MultiLabelBinarizer, StandardScaler
+
+from backend.app.models.compiled_forest import CompiledChainPredictor
+from backend.app.models.feature_encoder import FeatureEncoder
+from backend.app.models.forest_arrays import ForestArrays
+from backend.app.models.prediction_table import PredictionTable
+from backend.app.models.recommendation_model import PerfumeRecommendationModel
+
+LABELS = ['citrus', 'floral', 'musk', 'woody']
+GENDERS = ['M', 'F']
+MBTIS = ['ENFP', 'ISTJ', 'INFJ', 'ESTP']
+PURPOSES = ['self_satisfaction', 'good_impression', 'special_event']
+STYLES = ['casual', 'minimal', 'street', 'casual,street']
+COLORS = ['white', 'black', 'pink', 'white,black']
+
+
+def _profiles(rng, n):
+    return pd.DataFrame({
+        'age': rng.choice([15, 25, 35, 45, 55], size=n).astype(float),
+        'gender': rng.choice(GENDERS, size=n),
+        'mbti': rng.choice(MBTIS, size=n),
+        'purpose': rng.choice(PURPOSES, size=n),
+        'fashionstyle': rng.choice(STYLES, size=n),
+        'prefercolor': rng.choice(COLORS, size=n),
+    })
+
+
+def _engineer_features(X, scaler):
+    """train()과 같은 순서의 pandas 피처 엔지니어링."""
+    X_processed = X.copy()
+    numeric_features = X.select_dtypes(include=np.number).columns.tolist()
+    scaler.fit(X_processed[numeric_features])
+    X_processed[numeric_features] = scaler.transform(X_processed[numeric_features])
+    multilabel_cols = ['purpose', 'prefercolor', 'fashionstyle']
+    for col in multilabel_cols:
+        dummies = X_processed[col].str.get_dummies(sep=',')
+        dummies.columns = [f"{col}_{c.strip()}" for c in dummies.columns]
+        X_processed = pd.concat([X_processed, dummies], axis=1)
+    X_processed = pd.get_dummies(X_processed, columns=['gender', 'mbti'], dummy_na=False)
+    return X_processed.drop(columns=multilabel_cols).astype(float)
+
+
+@pytest.fixture(scope="module")
+def trained():
+    rng = np.random.default_rng(0)
+    X = _profiles(rng, 400)
+    scaler = StandardScaler()
+    X_processed = _engineer_features(X, scaler)
+    # 라벨은 피처와 약하게 연관된 무작위 값 (모든 링크가 두 클래스를 보도록)
+    y = [
+        [label for j, label in enumerate(LABELS) if (rng.random() < 0.3) or (j == i % len(LABELS))]
+        for i in range(len(X))
+    ]
+    mlb = MultiLabelBinarizer()
+    y_bin = mlb.fit_transform(y)
+    chain = ClassifierChain(RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0))
+    chain.fit(X_processed.to_numpy(), y_bin)
+    return X, X_processed, scaler, mlb, chain
+
+
+def _threshold_inputs(chain, X, rng):
+    """노드 임계값 위와 바로 양옆(float32 기준)에 놓인 입력 행."""
+    arrays = ForestArrays.from_chain(chain)
+    n_features = X.shape[1]
+    split = (np.asarray(arrays.nodes['left_child']) >= 0) & (np.asarray(arrays.nodes['feature']) < n_features)
+    features = np.asarray(arrays.nodes['feature'])[split]
+    thresholds = np.asarray(arrays.nodes['threshold'])[split]
+    picks = rng.choice(len(thresholds), size=min(200, len(thresholds)), replace=False)
+    rows = []
+    for pick in picks:
+        value = np.float32(thresholds[pick])
+        for candidate in (thresholds[pick], value, np.nextafter(value, np.float32(np.inf)),
+                          np.nextafter(value, np.float32(-np.inf))):
+            row = X[rng.integers(len(X))].copy()
+            row[features[pick]] = float(candidate)
+            rows.append(row)
+    return np.vstack(rows)
+
+
+def test_feature_encoder_matches_training_features(trained):
+    X, X_processed, scaler, _, _ = trained
+    encoder = FeatureEncoder(X_processed.columns.tolist(), scaler)
+    encoded = encoder.encode_batch(X.to_dict('records'))
+    np.testing.assert_array_equal(encoded, X_processed.to_numpy())
+    np.testing.assert_array_equal(encoder.encode(X.iloc[0].to_dict()), X_processed.to_numpy()[:1])
+
+
+@pytest.mark.parametrize("inputs", ["random", "thresholds"])
+def test_compiled_predictor_matches_classifier_chain(trained, inputs):
+    _, X_processed, _, _, chain = trained
+    rng = np.random.default_rng(1)
+    X = X_processed.to_numpy()
+    if inputs == "random":
+        X = rng.normal(size=(500, X.shape[1]))
+    else:
+        X = _threshold_inputs(chain, X, rng)
+    predictor = CompiledChainPredictor.compile(chain, ForestArrays.from_chain(chain))
+    labels, proba = predictor.predict(X)
+    np.testing.assert_array_equal(labels, chain.predict(X))
+    np.testing.assert_array_equal(proba, chain.predict_proba(X))
+
+
+def test_compiled_predictor_survives_save_and_load(trained, tmp_path):
+    _, X_processed, _, _, chain = trained
+    arrays = ForestArrays.from_chain(chain)
+    arrays.save(str(tmp_path))
+    CompiledChainPredictor.compile(chain, arrays).save(str(tmp_path))
+    loaded_arrays = ForestArrays.load(str(tmp_path))
+    predictor = CompiledChainPredictor.load(str(tmp_path), loaded_arrays)
+    X = X_processed.to_numpy()
+    np.testing.assert_array_equal(predictor.predict(X)[1], chain.predict_proba(X))
+    rebuilt = loaded_arrays.attach(ForestArrays.strip_trees(chain))
+    np.testing.assert_array_equal(rebuilt.predict_proba(X), chain.predict_proba(X))
+
+
+def test_compiled_predictor_rejects_nan(trained):
+    _, X_processed, _, _, chain = trained
+    predictor = CompiledChainPredictor.compile(chain, ForestArrays.from_chain(chain))
+    X = X_processed.to_numpy()[:2].copy()
+    X[0, 0] = np.nan
+    with pytest.raises(ValueError):
+        predictor.predict(X)
+
+
+@pytest.fixture
+def model(trained):
+    _, X_processed, scaler, mlb, chain = trained
+    m = PerfumeRecommendationModel()
+    m.model = chain
+    m.scaler = scaler
+    m.mlb = mlb
+    m.onehot_columns = X_processed.columns.tolist()
+    m.is_trained = True
+    return m
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_predict_matrix_matches_classifier_chain(model, trained, compiled):
+    _, X_processed, _, _, chain = trained
+    model.use_compiled_predictor = compiled
+    X = np.vstack([X_processed.to_numpy(), _threshold_inputs(chain, X_processed.to_numpy(), np.random.default_rng(2))])
+    labels, proba = model._predict_matrix(X)
+    np.testing.assert_array_equal(labels, chain.predict(X))
+    np.testing.assert_array_equal(proba, chain.predict_proba(X))
+
+
+def test_prediction_table_matches_live_inference(model):
+    model.table_dirpath = None
+    table = model.build_prediction_table(save=False)
+    encoder = model._get_feature_encoder()
+    rng = np.random.default_rng(3)
+    for age in range(0, 101):
+        profile = model.preprocess_input({
+            'age': age, 'gender': rng.choice(['남', '여']), 'mbti': rng.choice(MBTIS),
+            'purpose': rng.choice(['자기만족', 'special_event']), 'fashionstyle': rng.choice(['casual', 'street']),
+            'prefercolor': rng.choice(['흰색', '검정']),
+        })
+        result = table.lookup(encoder, profile)
+        assert result is not None
+        live = model._predict_matrix(encoder.encode(profile))
+        np.testing.assert_array_equal(result[0], live[0])
+        np.testing.assert_array_equal(result[1], live[1])
+    assert table.stats()['hit_rate'] == 1.0
+
+
+def test_prediction_cache_and_batch_match_single_prediction(model):
+    profiles = [
+        {'age': 27, 'gender': '여', 'mbti': 'ENFP', 'purpose': '자기만족', 'fashionstyle': 'casual', 'prefercolor': '흰색'},
+        {'age': 41, 'gender': '남', 'mbti': 'ISTJ', 'purpose': 'special_event', 'fashionstyle': 'street', 'prefercolor': '검정,분홍'},
+    ]
+    model.prediction_cache.clear()
+    first = [model.predict_categories(**profile) for profile in profiles]
+    cached = [model.predict_categories(**profile) for profile in profiles]
+    batch = model.predict_categories_batch(profiles)
+    assert model.prediction_cache.stats()['hits'] == len(profiles)
+    for expected, results in ((first, cached), (first, batch)):
+        for (labels, confidences), (other_labels, other_confidences) in zip(expected, results):
+            assert tuple(labels) == tuple(other_labels)
+            assert confidences == other_confidences
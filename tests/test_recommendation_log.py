@@ -0,0 +1,104 @@
+"""RecommendationLog(write-behind 추천 기록)의 저장, 재시도, 피드백 반영 동작을 메모리 SQLite로 확인합니다."""
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.app.database import Base, Perfume, Recommendation
+from backend.app.recommendation_log import RecommendationLog, RecommendationPending
+
+
+@pytest.fixture
+def session_factory():
+    # 모든 세션이 같은 메모리 DB 연결을 쓰도록 StaticPool 사용
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(Perfume(id=1, name="테스트 향수", brand="brand", category="floral", description="desc"))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+def _log(session_factory, **kwargs) -> RecommendationLog:
+    log = RecommendationLog(session_factory, id_block_size=10, **kwargs)
+    # 테스트에서는 백그라운드 저장 스레드 대신 flush()를 직접 호출
+    log._ensure_thread = lambda: None
+    return log
+
+
+def _saved(session_factory):
+    db = session_factory()
+    try:
+        return {row.id: row for row in db.execute(select(Recommendation)).scalars()}
+    finally:
+        db.close()
+
+
+def test_flush_saves_queued_rows_in_one_batch(session_factory):
+    log = _log(session_factory)
+    ids = [log.record(perfume_id=1, confidence_score=0.5, reason="r") for _ in range(15)]
+    assert len(set(ids)) == 15
+    assert _saved(session_factory) == {}
+
+    assert log.flush() == 15
+    assert sorted(_saved(session_factory)) == sorted(ids)
+    stats = log.stats()
+    assert stats['queued'] == 0 and stats['flushed'] == 15 and stats['flushes'] == 1
+    assert stats['blocks_reserved'] == 2
+
+
+def test_feedback_before_flush_is_saved_with_the_row(session_factory):
+    log = _log(session_factory)
+    recommendation_id = log.record(perfume_id=1, confidence_score=0.5, reason="r")
+    assert log.set_feedback(recommendation_id, True) is True
+    log.flush()
+    assert _saved(session_factory)[recommendation_id].is_liked is True
+    # 저장된 뒤에는 호출 측이 DB에서 갱신
+    assert log.set_feedback(recommendation_id, False) is False
+
+
+def test_failed_batch_is_retried_row_by_row_and_bad_row_dead_lettered(session_factory):
+    log = _log(session_factory, max_retries=3)
+    ids = [log.record(perfume_id=1, confidence_score=0.5, reason="r") for _ in range(5)]
+    # 같은 ID의 기록이 이미 있어 bulk insert가 실패하는 상황
+    db = session_factory()
+    db.add(Recommendation(id=ids[2], perfume_id=1, confidence_score=0.1, reason="existing"))
+    db.commit()
+    db.close()
+    assert log.set_feedback(ids[2], True) is True
+
+    assert log.flush() == 4
+    assert log.stats()['queued'] == 1
+    for _ in range(2):
+        assert log.flush() == 0
+
+    stats = log.stats()
+    assert stats['queued'] == 0
+    assert stats['dropped_rows'] == 1 and stats['dead_letters'] == 1 and stats['lost_feedback'] == 1
+    assert stats['failed_flushes'] == 3 and stats['retried_rows'] == 2
+    assert log.dead_letters[0]['id'] == ids[2] and log.dead_letters[0]['is_liked'] is True
+    saved = _saved(session_factory)
+    assert all(recommendation_id in saved for recommendation_id in ids)
+    assert saved[ids[2]].reason == "existing"
+
+
+def test_queue_cap_drops_oldest_rows(session_factory):
+    log = _log(session_factory, max_queued=3)
+    ids = [log.record(perfume_id=1, confidence_score=0.5, reason="r") for _ in range(5)]
+    assert log.flush() == 3
+    assert sorted(_saved(session_factory)) == ids[2:]
+    assert [row['id'] for row in log.dead_letters] == ids[:2]
+
+
+def test_feedback_wait_times_out_while_row_is_being_saved(session_factory):
+    log = _log(session_factory, feedback_wait_ms=50)
+    recommendation_id = log.record(perfume_id=1, confidence_score=0.5, reason="r")
+    # 저장 중인 상태를 흉내 냄
+    log._inflight = {recommendation_id: log._queued.pop(recommendation_id)}
+    with pytest.raises(RecommendationPending):
+        log.set_feedback(recommendation_id, True)